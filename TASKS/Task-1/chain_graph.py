@@ -0,0 +1,61 @@
+import networkx as nx
+from collections import defaultdict
+
+from chain_rules import GRAPH_RULE_KEY, LETTER_RULE
+from profiling import profile
+
+
+def build_letter_buckets(names, rule=None):
+    # Index every unique name by its head, its tail and its (head, tail) pair;
+    # with the default rule those are its first letter and last letter
+    rule = rule or LETTER_RULE
+    first = defaultdict(list)
+    last = defaultdict(list)
+    pair = defaultdict(list)
+
+    for name in dict.fromkeys(names):
+        first_letter = rule.head(name)
+        last_letter = rule.tail(name)
+        if first_letter is None:
+            continue
+        first[first_letter].append(name)
+        last[last_letter].append(name)
+        pair[(first_letter, last_letter)].append(name)
+
+    return {
+        'first': dict(first),
+        'last': dict(last),
+        'pair': dict(pair),
+    }
+
+
+def iter_chain_edges(buckets):
+    # Join the "ends with x" bucket against the "starts with x" bucket for every head x
+    # (a letter under the default rule)
+    first = buckets['first']
+    for tail, sources in buckets['last'].items():
+        targets = first.get(tail)
+        if not targets:
+            continue
+        for source in sources:
+            for target in targets:
+                if source != target:
+                    yield source, target
+
+
+def create_chain_graph(names, rule=None):
+    """Build the last-letter/first-letter DiGraph (or the one `rule` describes) and return it with its buckets."""
+    with profile('create_chain_graph', names=len(names)) as record:
+        buckets = build_letter_buckets(names, rule)
+
+        G = nx.DiGraph()
+        if rule is not None and rule != LETTER_RULE:
+            G.graph[GRAPH_RULE_KEY] = rule.describe()
+        G.add_nodes_from(names)
+        G.add_edges_from(iter_chain_edges(buckets))
+
+        if record is not None:
+            record['nodes'] = G.number_of_nodes()
+            record['edges'] = G.number_of_edges()
+
+    return G, buckets
@@ -0,0 +1,63 @@
+import unicodedata
+
+# Graph attribute recording the rule a chain graph was built with (absent for the letter rule)
+GRAPH_RULE_KEY = 'chain_rule'
+
+
+class ChainRule:
+    """Decides which names may follow which.
+
+    A target may follow a source when the first `overlap` characters of the
+    target's key equal the last `overlap` characters of the source's key, compared
+    case-insensitively. With normalize the key drops diacritics (NFKD), case and
+    every character that is not a letter or digit, so "Xi-an " chains on "n" and
+    "São Tomé" on "s" / "e". Names whose key is shorter than `overlap` get no edges.
+    """
+
+    def __init__(self, overlap=1, normalize=False):
+        if overlap < 1:
+            raise ValueError("overlap must be at least 1")
+        self.overlap = overlap
+        self.normalize = normalize
+
+    def key(self, name):
+        if not self.normalize:
+            return name
+        decomposed = unicodedata.normalize('NFKD', name)
+        return ''.join(ch for ch in decomposed if ch.isalnum() and not unicodedata.combining(ch)).casefold()
+
+    def head(self, name):
+        key = self.key(name)
+        return key[:self.overlap].lower() if len(key) >= self.overlap else None
+
+    def tail(self, name):
+        key = self.key(name)
+        return key[-self.overlap:].lower() if len(key) >= self.overlap else None
+
+    def describe(self):
+        return f'overlap={self.overlap},normalize={self.normalize}'
+
+    @classmethod
+    def parse(cls, description):
+        # Inverse of describe()
+        fields = dict(field.split('=', 1) for field in description.split(','))
+        return cls(overlap=int(fields['overlap']), normalize=fields['normalize'] == 'True')
+
+    def __eq__(self, other):
+        return isinstance(other, ChainRule) and other.describe() == self.describe()
+
+    def __hash__(self):
+        return hash(self.describe())
+
+    def __repr__(self):
+        return f'ChainRule({self.describe()})'
+
+
+# The original last-letter/first-letter game
+LETTER_RULE = ChainRule()
+
+
+def graph_rule(G):
+    # The rule G was built with; kept as a string so GraphML and GEXF exports can carry it
+    description = G.graph.get(GRAPH_RULE_KEY)
+    return ChainRule.parse(description) if description else LETTER_RULE
@@ -0,0 +1,124 @@
+import random
+from collections import deque
+
+from chain_graph import build_letter_buckets
+from chain_rules import graph_rule
+
+# Stands for the source name itself in the class-level BFS
+_SOURCE = -1
+
+
+def is_chain_graph(G, buckets=None):
+    # Every node must have exactly the degrees the letter buckets of G's rule predict
+    rule = graph_rule(G)
+    if buckets is None:
+        buckets = build_letter_buckets(G.nodes(), rule)
+    first, last = buckets['first'], buckets['last']
+    for name in G.nodes():
+        f, l = rule.head(name), rule.tail(name)
+        if f is None:
+            if G.degree(name):
+                return False
+            continue
+        if G.out_degree(name) != len(first.get(l, ())) - (f == l):
+            return False
+        if G.in_degree(name) != len(last.get(f, ())) - (f == l):
+            return False
+
+    # Degrees alone can be matched by a rewired graph; with every edge a chain move they cannot
+    return all(u != v and rule.tail(u) == rule.head(v) for u, v in G.edges())
+
+
+def _class_dependencies(pairs, sizes, by_first, source):
+    """Brandes single-source pass from one name of class `source`, run on classes.
+
+    Apart from the source, every name in a class sits at the same distance with the
+    same number of shortest paths, so each class is one BFS node whose multiplicity
+    is its size, less one for the source's own class. Returns the dependency of a
+    single name of each reached class.
+    """
+    multiplicity = list(sizes)
+    multiplicity[source] -= 1
+
+    distance = {_SOURCE: 0}
+    sigma = {_SOURCE: 1.0}
+    order = []
+    queue = deque([_SOURCE])
+    while queue:
+        node = queue.popleft()
+        order.append(node)
+        last = pairs[source if node == _SOURCE else node][1]
+        weight = 1 if node == _SOURCE else multiplicity[node]
+        for target in by_first.get(last, ()):
+            if multiplicity[target] == 0:
+                continue
+            if target not in distance:
+                distance[target] = distance[node] + 1
+                sigma[target] = 0.0
+                queue.append(target)
+            if distance[target] == distance[node] + 1:
+                sigma[target] += sigma[node] * weight
+
+    delta = dict.fromkeys(order, 0.0)
+    for node in reversed(order):
+        last = pairs[source if node == _SOURCE else node][1]
+        for target in by_first.get(last, ()):
+            if distance.get(target) == distance[node] + 1:
+                delta[node] += multiplicity[target] * sigma[node] / sigma[target] * (1 + delta[target])
+
+    del delta[_SOURCE]
+    return delta
+
+
+def class_betweenness(G, normalized=True, k=None, seed=None, buckets=None):
+    """Exact betweenness of a chain graph computed on its (first, last) letter classes.
+
+    Names in one class are interchangeable, so one Brandes pass per class, on a graph
+    of at most 26 * 26 nodes, stands in for one pass per name. The result matches
+    nx.betweenness_centrality(G, normalized=normalized). With k, only k randomly
+    sampled source names are used and the scores are scaled up by n / k. Names too
+    short for G's rule sit in no class and score 0.
+    """
+    if buckets is None:
+        buckets = build_letter_buckets(G.nodes(), graph_rule(G))
+    pairs = list(buckets['pair'])
+    members = [buckets['pair'][pair] for pair in pairs]
+    sizes = [len(group) for group in members]
+    by_first = {}
+    for i, (first, _) in enumerate(pairs):
+        by_first.setdefault(first, []).append(i)
+
+    n = G.number_of_nodes()
+    if k is None:
+        sources = dict(enumerate(sizes))
+        sampled = None
+    else:
+        sampled = set(random.Random(seed).sample(list(G.nodes()), k))
+        class_of = {name: i for i, group in enumerate(members) for name in group}
+        sources = {}
+        for name in sampled.intersection(class_of):
+            sources[class_of[name]] = sources.get(class_of[name], 0) + 1
+
+    # other[D]: dependency on D summed over sources outside D; own[D]: per-source dependency inside D
+    other = [0.0] * len(pairs)
+    own = [0.0] * len(pairs)
+    for source, count in sources.items():
+        for target, dependency in _class_dependencies(pairs, sizes, by_first, source).items():
+            if target == source:
+                own[target] = dependency
+            else:
+                other[target] += count * dependency
+
+    scale = 1.0
+    if normalized and n > 2:
+        scale = 1 / ((n - 1) * (n - 2))
+    if k is not None:
+        scale *= n / k
+
+    betweenness = {}
+    for i, group in enumerate(members):
+        for name in group:
+            # A source never counts towards its own betweenness
+            same_class_sources = sources.get(i, 0) - (sampled is None or name in sampled)
+            betweenness[name] = (other[i] + same_class_sources * own[i]) * scale
+    return {node: betweenness.get(node, 0.0) for node in G.nodes()}
@@ -0,0 +1,312 @@
+from collections.abc import Mapping
+
+import networkx as nx
+import numpy as np
+
+from chain_rules import LETTER_RULE
+
+# Cap on the temporary (rows x bucket) block built while filling the adjacency arrays
+_JOIN_BLOCK = 1 << 20
+
+# Shared, read-only-by-convention attribute dict for every node and edge of a view
+_NO_ATTRIBUTES = {}
+
+
+def _letter_codes(letters):
+    _, codes = np.unique(np.asarray(letters, dtype=object).astype(str), return_inverse=True)
+    return codes.ravel().astype(np.int32)
+
+
+def _letter_join(row_letters, neighbor_letters):
+    """CSR arrays where row r lists every j != r with neighbor_letters[j] == row_letters[r].
+
+    Each row is in ascending id order, i.e. node order, like the DiGraph built by
+    create_chain_graph.
+    """
+    n = len(row_letters)
+    letter_count = int(max(row_letters.max(initial=-1), neighbor_letters.max(initial=-1))) + 1
+    order = np.argsort(neighbor_letters, kind='stable').astype(np.int32)
+    bounds = np.searchsorted(neighbor_letters[order], np.arange(letter_count + 1))
+
+    bucket_size = np.diff(bounds)
+    degree = bucket_size[row_letters] - (row_letters == neighbor_letters)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(degree, out=indptr[1:])
+    indices = np.empty(indptr[-1], dtype=np.int32)
+
+    for letter in range(letter_count):
+        bucket = order[bounds[letter]:bounds[letter + 1]]
+        rows = np.flatnonzero(row_letters == letter).astype(np.int32)
+        if not len(bucket) or not len(rows):
+            continue
+        step = max(1, _JOIN_BLOCK // len(bucket))
+        for start in range(0, len(rows), step):
+            chunk = rows[start:start + step]
+            block = np.broadcast_to(bucket, (len(chunk), len(bucket)))
+            keep = block != chunk[:, None]
+            values = block[keep]
+            lengths = keep.sum(axis=1)
+            offsets = np.cumsum(lengths) - lengths
+            destination = np.repeat(indptr[chunk] - offsets, lengths) + np.arange(len(values))
+            indices[destination] = values
+
+    return indptr, indices
+
+
+class NodeHandle:
+    """Lightweight reference to one node of a CompactDiGraph."""
+
+    __slots__ = ('graph', 'id')
+
+    def __init__(self, graph, id):
+        self.graph = graph
+        self.id = id
+
+    @property
+    def name(self):
+        return self.graph.nodes[self.id]
+
+    def out_degree(self):
+        return int(self.graph.out_indptr[self.id + 1] - self.graph.out_indptr[self.id])
+
+    def in_degree(self):
+        return int(self.graph.in_indptr[self.id + 1] - self.graph.in_indptr[self.id])
+
+    def successors(self):
+        return (NodeHandle(self.graph, j) for j in self.graph.successor_ids(self.id).tolist())
+
+    def predecessors(self):
+        return (NodeHandle(self.graph, j) for j in self.graph.predecessor_ids(self.id).tolist())
+
+    def __eq__(self, other):
+        return isinstance(other, NodeHandle) and other.graph is self.graph and other.id == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f'NodeHandle({self.name!r})'
+
+
+class CompactDiGraph:
+    """Directed graph held as interned names plus int32 CSR (out) and CSC (in) arrays.
+
+    Takes 4 bytes per edge in each direction instead of the dict-of-dicts entries an
+    nx.DiGraph keeps per edge. Rows are sorted by node id, so has_edge is a binary
+    search. Use networkx_view() to run NetworkX-based analyses on it unchanged.
+    """
+
+    __slots__ = ('nodes', 'index', 'out_indptr', 'out_indices', 'in_indptr', 'in_indices')
+
+    def __init__(self, nodes, out_indptr, out_indices, in_indptr, in_indices):
+        self.nodes = list(nodes)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.out_indptr = out_indptr
+        self.out_indices = out_indices
+        self.in_indptr = in_indptr
+        self.in_indices = in_indices
+
+    @classmethod
+    def from_names(cls, names, rule=None):
+        """The chain graph `rule` (by default the letter rule) builds on names, without any per-edge Python."""
+        rule = rule or LETTER_RULE
+        nodes = list(dict.fromkeys(names))
+        chained = [i for i, name in enumerate(nodes) if rule.head(name) is not None]
+        codes = _letter_codes([rule.head(nodes[i]) for i in chained] + [rule.tail(nodes[i]) for i in chained])
+        # Names too short for the rule share a head code and a different tail code that nothing else uses,
+        # so they get no edges
+        base = int(codes.max(initial=-1)) + 1
+        first = np.full(len(nodes), base, dtype=np.int32)
+        last = np.full(len(nodes), base + 1, dtype=np.int32)
+        first[chained] = codes[:len(chained)]
+        last[chained] = codes[len(chained):]
+        out_indptr, out_indices = _letter_join(last, first)
+        in_indptr, in_indices = _letter_join(first, last)
+        return cls(nodes, out_indptr, out_indices, in_indptr, in_indices)
+
+    @classmethod
+    def from_networkx(cls, G):
+        nodes = list(G.nodes())
+        index = {node: i for i, node in enumerate(nodes)}
+        m = G.number_of_edges()
+        sources = np.fromiter((index[u] for u, _ in G.edges()), dtype=np.int32, count=m)
+        targets = np.fromiter((index[v] for _, v in G.edges()), dtype=np.int32, count=m)
+        n = len(nodes)
+        return cls(nodes, *cls._compress(sources, targets, n), *cls._compress(targets, sources, n))
+
+    @staticmethod
+    def _compress(rows, columns, n):
+        order = np.lexsort((columns, rows))
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        return indptr, columns[order].astype(np.int32)
+
+    def number_of_nodes(self):
+        return len(self.nodes)
+
+    def number_of_edges(self):
+        return int(self.out_indptr[-1])
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def node(self, name):
+        return NodeHandle(self, self.index[name])
+
+    def handles(self):
+        return (NodeHandle(self, i) for i in range(len(self.nodes)))
+
+    def out_degrees(self):
+        return np.diff(self.out_indptr)
+
+    def in_degrees(self):
+        return np.diff(self.in_indptr)
+
+    def successor_ids(self, i):
+        return self.out_indices[self.out_indptr[i]:self.out_indptr[i + 1]]
+
+    def predecessor_ids(self, i):
+        return self.in_indices[self.in_indptr[i]:self.in_indptr[i + 1]]
+
+    def successors(self, name):
+        return (self.nodes[j] for j in self.successor_ids(self.index[name]).tolist())
+
+    def predecessors(self, name):
+        return (self.nodes[j] for j in self.predecessor_ids(self.index[name]).tolist())
+
+    def has_edge(self, u, v):
+        if u not in self.index or v not in self.index:
+            return False
+        row = self.successor_ids(self.index[u])
+        j = self.index[v]
+        position = np.searchsorted(row, j)
+        return position < len(row) and row[position] == j
+
+    def adjacency(self):
+        # scipy CSR view that shares the index arrays
+        import scipy.sparse as sp
+
+        n = len(self.nodes)
+        data = np.ones(len(self.out_indices), dtype=np.int64)
+        return sp.csr_matrix((data, self.out_indices, self.out_indptr), shape=(n, n))
+
+    def memory_bytes(self):
+        # Array storage only; the interned name strings are shared with the caller
+        return sum(array.nbytes for array in (self.out_indptr, self.out_indices, self.in_indptr, self.in_indices))
+
+    def reversed(self):
+        # Same node ids with the CSR and CSC arrays swapped; the arrays are shared, not copied
+        return CompactDiGraph(self.nodes, self.in_indptr, self.in_indices, self.out_indptr, self.out_indices)
+
+    def networkx_view(self):
+        return NetworkXView(self)
+
+
+class _Neighbors(Mapping):
+    # Neighbour dict of one node: name -> (empty) edge attributes
+    __slots__ = ('graph', 'ids')
+
+    def __init__(self, graph, ids):
+        self.graph = graph
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        nodes = self.graph.nodes
+        return (nodes[j] for j in self.ids.tolist())
+
+    def __contains__(self, name):
+        j = self.graph.index.get(name)
+        if j is None:
+            return False
+        position = np.searchsorted(self.ids, j)
+        return position < len(self.ids) and self.ids[position] == j
+
+    def __getitem__(self, name):
+        if name in self:
+            return _NO_ATTRIBUTES
+        raise KeyError(name)
+
+    def items(self):
+        return ((name, _NO_ATTRIBUTES) for name in self)
+
+
+class _Adjacency(Mapping):
+    __slots__ = ('graph', 'indptr', 'indices')
+
+    def __init__(self, graph, indptr, indices):
+        self.graph = graph
+        self.indptr = indptr
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.graph.nodes)
+
+    def __iter__(self):
+        return iter(self.graph.nodes)
+
+    def __contains__(self, name):
+        return name in self.graph.index
+
+    def __getitem__(self, name):
+        i = self.graph.index[name]
+        return _Neighbors(self.graph, self.indices[self.indptr[i]:self.indptr[i + 1]])
+
+
+class _NodeAttributes(Mapping):
+    __slots__ = ('graph',)
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __len__(self):
+        return len(self.graph.nodes)
+
+    def __iter__(self):
+        return iter(self.graph.nodes)
+
+    def __contains__(self, name):
+        return name in self.graph.index
+
+    def __getitem__(self, name):
+        if name in self.graph.index:
+            return _NO_ATTRIBUTES
+        raise KeyError(name)
+
+
+class NetworkXView(nx.DiGraph):
+    """Read-only nx.DiGraph whose node and adjacency dicts are backed by a CompactDiGraph.
+
+    NetworkX algorithms and the analyse.py functions run on it as on the original
+    graph; adding or removing nodes or edges is not supported. NetworkX builds new
+    graphs with G.__class__() (copy, subgraph copies, reverse), so without a
+    CompactDiGraph this is a plain, mutable nx.DiGraph.
+    """
+
+    def __init__(self, compact=None, **attr):
+        if not isinstance(compact, CompactDiGraph):
+            super().__init__(compact, **attr)
+            self.compact = None
+            return
+        super().__init__(**attr)
+        self.compact = compact
+        self._node = _NodeAttributes(compact)
+        self._adj = _Adjacency(compact, compact.out_indptr, compact.out_indices)
+        self._pred = _Adjacency(compact, compact.in_indptr, compact.in_indices)
+
+    def number_of_edges(self, u=None, v=None):
+        if self.compact is None:
+            return super().number_of_edges(u, v)
+        if u is None:
+            return self.compact.number_of_edges()
+        return int(self.compact.has_edge(u, v))
+
+    def reverse(self, copy=True):
+        if self.compact is None:
+            return super().reverse(copy=copy)
+        return NetworkXView(self.compact.reversed())
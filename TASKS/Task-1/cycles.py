@@ -0,0 +1,129 @@
+import string
+from collections import defaultdict, deque
+
+import numpy as np
+
+from chain_rules import LETTER_RULE, graph_rule
+
+LETTERS = string.ascii_lowercase
+LETTER_INDEX = {letter: i for i, letter in enumerate(LETTERS)}
+
+
+def transition_keys(G, rule=None):
+    # The 26 letters under the letter rule, otherwise every head and tail the rule produces
+    rule = rule or graph_rule(G)
+    if rule == LETTER_RULE:
+        return LETTERS
+    keys = {rule.head(name) for name in G.nodes()} | {rule.tail(name) for name in G.nodes()}
+    keys.discard(None)
+    return sorted(keys)
+
+
+def letter_transition_matrix(G, rule=None):
+    # M[a][b] = number of names that start with letter a and end with letter b, indexed by
+    # transition_keys (heads and tails of the rule G was built with)
+    rule = rule or graph_rule(G)
+    keys = transition_keys(G, rule)
+    index = LETTER_INDEX if keys is LETTERS else {key: i for i, key in enumerate(keys)}
+    M = np.zeros((len(keys), len(keys)), dtype=np.int64)
+    for name in G.nodes():
+        first = index.get(rule.head(name))
+        last = index.get(rule.tail(name))
+        if first is not None and last is not None:
+            M[first, last] += 1
+    return M
+
+
+def letter_cycle_counts(G, max_length=10):
+    """Count closed name chains of each length from traces of powers of the letter matrix.
+
+    trace(M^k) counts closed walks of k names at the letter level (names may repeat and
+    every rotation is counted), so trace(M^k) // k is an upper bound on the number of
+    simple k-cycles in G. Counting starts at two names: a name never follows itself,
+    so the k=1 trace (names starting and ending on one letter) is not a chain.
+    """
+    M = letter_transition_matrix(G)
+    # A closed walk only visits keys some name starts with and some name ends with
+    core = (M.sum(axis=0) > 0) & (M.sum(axis=1) > 0)
+    # Python ints avoid int64 overflow for longer chains
+    M = M[np.ix_(core, core)].astype(object)
+    power = M.dot(M)
+    counts = {}
+    for k in range(2, max_length + 1):
+        walks = int(np.trace(power))
+        counts[k] = {'closed_walks': walks, 'cycle_upper_bound': walks // k}
+        power = power.dot(M)
+    return counts
+
+
+def letter_distances(G, rule=None):
+    # Fewest names needed to move the chain from ending in letter a to ending in letter b
+    # (heads and tails of the rule G was built with)
+    rule = rule or graph_rule(G)
+    letter_graph = defaultdict(set)
+    tails = set()
+    for name in G.nodes():
+        head, tail = rule.head(name), rule.tail(name)
+        if head is not None:
+            letter_graph[head].add(tail)
+            tails.add(tail)
+
+    distances = {}
+    for source in set(letter_graph) | tails:
+        seen = {source: 0}
+        queue = deque([source])
+        while queue:
+            letter = queue.popleft()
+            for nxt in letter_graph.get(letter, ()):
+                if nxt not in seen:
+                    seen[nxt] = seen[letter] + 1
+                    queue.append(nxt)
+        distances[source] = seen
+    return distances
+
+
+def iter_cycles(G, max_length=None, max_results=None, min_length=2):
+    """Yield each simple cycle of G once, up to max_length names and max_results cycles.
+
+    Every cycle is reported exactly once, rotated to start at its earliest node in
+    G.nodes() order. Branches that cannot close within max_length names are pruned
+    using letter-level distances back to the start letter, taken from the rule G was
+    built with.
+    """
+    order = {node: i for i, node in enumerate(G.nodes())}
+    if max_length is not None:
+        rule = graph_rule(G)
+        distances = letter_distances(G, rule)
+        tails = {node: rule.tail(node) for node in G.nodes()}
+    found = 0
+
+    for start in G.nodes():
+        start_index = order[start]
+        start_letter = rule.head(start) if max_length is not None else None
+        path = [start]
+        on_path = {start}
+        stack = [iter(G.successors(start))]
+
+        while stack:
+            for nxt in stack[-1]:
+                if nxt == start:
+                    if len(path) >= min_length:
+                        yield list(path)
+                        found += 1
+                        if max_results is not None and found >= max_results:
+                            return
+                    continue
+                if order[nxt] < start_index or nxt in on_path:
+                    continue
+                if max_length is not None:
+                    # Names still needed after nxt before one can lead back into start
+                    gap = distances.get(tails[nxt], {}).get(start_letter)
+                    if gap is None or len(path) + 1 + gap > max_length:
+                        continue
+                path.append(nxt)
+                on_path.add(nxt)
+                stack.append(iter(G.successors(nxt)))
+                break
+            else:
+                stack.pop()
+                on_path.discard(path.pop())
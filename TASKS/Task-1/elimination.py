@@ -0,0 +1,46 @@
+import heapq
+from collections import deque
+
+
+def find_sink_nodes(G):
+    return [node for node, out_degree in G.out_degree() if out_degree == 0]
+
+
+def elimination_distances(G):
+    """Multi-source BFS backwards from every sink.
+
+    Returns (distances, next_hop): distances[node] is the fewest moves from node to a
+    dead end, and following next_hop from node traces one such shortest path.
+    Nodes that cannot reach a sink are left out of both dicts.
+    """
+    distances = {}
+    next_hop = {}
+    queue = deque()
+
+    for sink in find_sink_nodes(G):
+        distances[sink] = 0
+        queue.append(sink)
+
+    while queue:
+        node = queue.popleft()
+        for predecessor in G.predecessors(node):
+            if predecessor not in distances:
+                distances[predecessor] = distances[node] + 1
+                next_hop[predecessor] = node
+                queue.append(predecessor)
+
+    return distances, next_hop
+
+
+def elimination_path(next_hop, node):
+    path = [node]
+    while path[-1] in next_hop:
+        path.append(next_hop[path[-1]])
+    return path
+
+
+def top_elimination_paths(G, k=5):
+    # The k non-sink nodes closest to a dead end, each with one witness path
+    distances, next_hop = elimination_distances(G)
+    closest = heapq.nsmallest(k, next_hop, key=distances.__getitem__)
+    return [(node, distances[node], elimination_path(next_hop, node)) for node in closest]
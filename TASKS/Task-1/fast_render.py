@@ -0,0 +1,112 @@
+import os
+import pickle
+
+import matplotlib.pyplot as plt
+import networkx as nx
+import numpy as np
+from matplotlib.collections import LineCollection
+
+from cycles import letter_transition_matrix, transition_keys
+from graph_cache import REPO_ROOT, graph_fingerprint
+from graph_metrics import get_metrics
+
+DEFAULT_LAYOUT_DIR = os.path.join(REPO_ROOT, '.cache', 'layouts')
+
+# Above this many nodes the per-node labels are unreadable, so they are skipped
+MAX_LABELLED_NODES = 300
+
+
+def cached_layout(G, cache_dir=DEFAULT_LAYOUT_DIR, seed=0):
+    """spring_layout positions for G, computed once per graph fingerprint."""
+    path = os.path.join(cache_dir, f'{graph_fingerprint(G)}-{seed}.pickle') if cache_dir else None
+    if path and os.path.exists(path):
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            # Corrupt or partially written entry, fall through and recompute it
+            pass
+
+    pos = nx.spring_layout(G, k=0.9, iterations=50, seed=seed)
+
+    if path:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(pos, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    return pos
+
+
+def top_edges(G, k, metrics=None, centrality='degree_centrality'):
+    # The k edges whose endpoints have the highest combined centrality
+    scores = getattr(get_metrics(G, metrics), centrality)
+    edges = list(G.edges())
+    if k is None or k >= len(edges):
+        return edges
+    values = np.fromiter((scores[u] + scores[v] for u, v in edges), dtype=np.float64, count=len(edges))
+    keep = np.argpartition(-values, k - 1)[:k]
+    return [edges[i] for i in keep]
+
+
+def visualize_graph_fast(G, path='cities_and_countries.png', max_edges=None, metrics=None,
+                         centrality='degree_centrality', layout_dir=DEFAULT_LAYOUT_DIR, dpi=150):
+    """Render G with a cached layout and every edge in one LineCollection (no arrow patches).
+
+    max_edges keeps only the top edges by endpoint centrality as a level-of-detail cut.
+    """
+    pos = cached_layout(G, cache_dir=layout_dir)
+    nodes = list(G.nodes())
+    coords = np.array([pos[node] for node in nodes]).reshape(-1, 2)
+
+    edges = top_edges(G, max_edges, metrics=metrics, centrality=centrality)
+    segments = np.array([(pos[u], pos[v]) for u, v in edges]).reshape(-1, 2, 2)
+
+    degrees = np.array([G.degree(node) for node in nodes], dtype=float)
+    max_degree = degrees.max() if len(degrees) and degrees.max() > 0 else 1.0
+
+    fig, ax = plt.subplots(figsize=(20, 20))
+    ax.set_title("Country Connection Graph", fontsize=20, fontweight='bold')
+    ax.add_collection(LineCollection(segments, colors='gray', linewidths=0.3, alpha=0.3))
+    ax.scatter(coords[:, 0], coords[:, 1], c=degrees / max_degree, cmap='viridis', s=30, alpha=0.8, zorder=2)
+
+    if len(nodes) <= MAX_LABELLED_NODES:
+        for node, (x, y) in zip(nodes, coords):
+            ax.text(x, y, node, fontsize=8, fontweight='bold', ha='center', va='center', zorder=3)
+
+    ax.autoscale()
+    ax.axis('off')
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+
+
+def visualize_letter_overview(G, path='letter_overview.png', dpi=150):
+    """Letter super-nodes (26, or one per head and tail under another chain rule) sized
+    by how many names start with them, joined by first-to-last letter edges whose
+    width follows the number of names on them."""
+    keys = transition_keys(G)
+    M = letter_transition_matrix(G)
+    angles = np.linspace(0, 2 * np.pi, len(keys), endpoint=False)
+    coords = np.column_stack((np.cos(angles), np.sin(angles)))
+
+    sources, targets = np.nonzero(M)
+    weights = M[sources, targets].astype(float)
+    segments = np.stack((coords[sources], coords[targets]), axis=1)
+    widths = 0.5 + 6 * weights / weights.max() if len(weights) else []
+
+    bucket_sizes = M.sum(axis=1)
+
+    fig, ax = plt.subplots(figsize=(12, 12))
+    ax.set_title("Letter Transition Overview", fontsize=18, fontweight='bold')
+    ax.add_collection(LineCollection(segments, colors='steelblue', linewidths=widths, alpha=0.35))
+    ax.scatter(coords[:, 0], coords[:, 1], s=100 + 40 * bucket_sizes, c=bucket_sizes, cmap='viridis', zorder=2)
+    for letter, (x, y) in zip(keys, coords):
+        ax.text(x, y, letter.upper(), fontsize=12, fontweight='bold', ha='center', va='center', zorder=3)
+
+    ax.set_xlim(-1.2, 1.2)
+    ax.set_ylim(-1.2, 1.2)
+    ax.set_aspect('equal')
+    ax.axis('off')
+    fig.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
@@ -0,0 +1,156 @@
+from collections import defaultdict
+
+from chain_rules import graph_rule
+from graph_cache import COUNTRIES_PATH, load_chain_graph, load_names
+
+
+class SearchLimitExceeded(Exception):
+    pass
+
+
+class ChainGameSolver:
+    """Exact solver for the last-letter/first-letter naming game on a chain graph.
+
+    Players alternate naming an unused node whose first letter matches the last
+    letter of the previous one, and a player with no legal name loses. Names that
+    share a (first letter, last letter) pair are interchangeable, so a position is
+    just the current letter plus how many names of each pair class are left. Those
+    counts are packed into one int (one bit field per class), which doubles as the
+    transposition-table key. Under another chain rule the letters are the heads and
+    tails the rule on G gives; names too short for it have no moves either way and
+    are kept out of the classes.
+    """
+
+    def __init__(self, G, max_states=None):
+        self.rule = graph_rule(G)
+        classes = defaultdict(list)
+        self.unchained = []
+        for name in G.nodes():
+            first = self.rule.head(name)
+            if first is None:
+                self.unchained.append(name)
+            else:
+                classes[(first, self.rule.tail(name))].append(name)
+
+        self.pairs = sorted(classes)
+        self.names = [classes[pair] for pair in self.pairs]
+        self.pair_index = {pair: i for i, pair in enumerate(self.pairs)}
+        self.max_states = max_states
+        self.table = {}
+
+        # Bit-field layout: class i occupies `width` bits starting at shift[i]
+        self.shift = []
+        self.unit = []
+        self.field_mask = []
+        self.letter_mask = defaultdict(int)
+        self.moves_from = defaultdict(list)
+        offset = 0
+        for i, (first, last) in enumerate(self.pairs):
+            width = len(self.names[i]).bit_length()
+            self.shift.append(offset)
+            self.unit.append(1 << offset)
+            self.field_mask.append(((1 << width) - 1) << offset)
+            self.letter_mask[first] |= self.field_mask[i]
+            self.moves_from[first].append(i)
+            offset += width
+
+        self.full_state = sum(len(self.names[i]) << self.shift[i] for i in range(len(self.pairs)))
+
+    def state_for(self, used):
+        # Packed counts after removing every name in `used`
+        state = self.full_state
+        for name in used:
+            if self.rule.head(name) is not None:
+                state -= self.unit[self.pair_index[(self.rule.head(name), self.rule.tail(name))]]
+        return state
+
+    def count(self, state, i):
+        return (state & self.field_mask[i]) >> self.shift[i]
+
+    def _legal_classes(self, letter, state):
+        return [i for i in self.moves_from.get(letter, ()) if state & self.field_mask[i]]
+
+    def wins(self, letter, state):
+        """True if the player who must name something starting with `letter` can force a win."""
+        key = (state, letter)
+        cached = self.table.get(key)
+        if cached is not None:
+            return cached
+
+        if self.max_states is not None and len(self.table) >= self.max_states:
+            raise SearchLimitExceeded(len(self.table))
+
+        moves = []
+        result = False
+        for i in self._legal_classes(letter, state):
+            after = state - self.unit[i]
+            reply_letter = self.pairs[i][1]
+            reply_options = after & self.letter_mask.get(reply_letter, 0)
+            if not reply_options:
+                # The opponent is left with no legal name
+                result = True
+                break
+            moves.append((reply_options.bit_count(), i, after, reply_letter))
+
+        if not result:
+            # Try the moves that leave the opponent the fewest distinct replies first
+            moves.sort()
+            for _, _, after, reply_letter in moves:
+                if not self.wins(reply_letter, after):
+                    result = True
+                    break
+
+        self.table[key] = result
+        return result
+
+    def winning_move(self, letter, used=()):
+        # One name that keeps the player to move winning, or None if the position is lost
+        state = self.state_for(used)
+        used = set(used)
+        for i in self._legal_classes(letter, state):
+            after = state - self.unit[i]
+            if not self.wins(self.pairs[i][1], after):
+                return next(name for name in self.names[i] if name not in used)
+        return None
+
+    def solve_start(self, name):
+        """Outcome of opening the game with `name`.
+
+        Returns (opener_wins, reply) where reply is a winning answer for the
+        opponent when the opener loses, else None.
+        """
+        letter = self.rule.tail(name)
+        if letter is None:
+            # Nothing can follow a name too short for the rule
+            return True, None
+        after = self.state_for([name])
+        if self.wins(letter, after):
+            return False, self.winning_move(letter, [name])
+        return True, None
+
+    def solve_all(self):
+        # Names in the same pair class share transposition-table entries, so only
+        # the first opener of each class does real search
+        openers = [name for names in self.names for name in names] + self.unchained
+        return {name: self.solve_start(name) for name in openers}
+
+
+def main():
+    G, _ = load_chain_graph(load_names(COUNTRIES_PATH))
+    solver = ChainGameSolver(G)
+    results = solver.solve_all()
+
+    winning = sorted(name for name, (opener_wins, _) in results.items() if opener_wins)
+    print(f"{len(winning)} of {len(results)} opening countries win with perfect play:")
+    print(", ".join(winning))
+
+    print("\nWinning replies against the losing openings:")
+    for name, (opener_wins, reply) in sorted(results.items()):
+        if not opener_wins:
+            print(f"{name} -> {reply}")
+
+    print(f"\nPositions in the transposition table: {len(solver.table)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import networkx as nx
+
+
+def component_labels(components):
+    # Map every node to the index of the component that contains it
+    labels = {}
+    for label, component in enumerate(components):
+        for node in component:
+            labels[node] = label
+    return labels
+
+
+def find_cross_component_edges(G, labels):
+    return [(source, target) for source, target in G.edges() if labels[source] != labels[target]]
+
+
+def find_gateway_nodes(G, components):
+    # Endpoints of every edge that leaves its component, found in one pass over the edges
+    labels = component_labels(components)
+    gateways = set()
+    for source, target in find_cross_component_edges(G, labels):
+        gateways.add(source)
+        gateways.add(target)
+    return gateways
+
+
+def find_wcc_gateways(G):
+    return find_gateway_nodes(G, nx.weakly_connected_components(G))
+
+
+def find_scc_gateways(G):
+    return find_gateway_nodes(G, nx.strongly_connected_components(G))
@@ -0,0 +1,105 @@
+import hashlib
+import os
+import pickle
+
+import networkx as nx
+
+from chain_graph import create_chain_graph
+from chain_rules import LETTER_RULE
+from profiling import profile
+from streaming import iter_names
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+DATASET_DIR = os.path.join(REPO_ROOT, 'dataset')
+DEFAULT_CACHE_DIR = os.path.join(REPO_ROOT, '.cache', 'chain_graph')
+
+COUNTRIES_PATH = os.path.join(DATASET_DIR, 'cleaned_countries.txt')
+CITIES_PATH = os.path.join(DATASET_DIR, 'cities.txt')
+CITY_CSV_PATH = os.path.join(DATASET_DIR, 'world-city-listing-table_modified.csv')
+GRAPHML_PATH = os.path.join(DATASET_DIR, 'country_graph.graphml')
+
+# The one order every entry point merges the full dataset in, so they share a cache entry
+DATASET_PATHS = (CITY_CSV_PATH, COUNTRIES_PATH)
+
+# Bump this whenever the pickled payload changes shape
+CACHE_VERSION = 3
+
+
+def read_names(path, column='city'):
+    if path.endswith('.graphml'):
+        return [str(node).strip() for node in nx.read_graphml(path).nodes()]
+    return list(iter_names(path, column=column))
+
+
+def load_names(*paths):
+    names = []
+    for path in paths:
+        names.extend(read_names(path))
+    # Drop duplicates but keep the first-seen order
+    return list(dict.fromkeys(names))
+
+
+def names_fingerprint(names, rule=None):
+    digest = hashlib.sha256(f'chain-graph-v{CACHE_VERSION}'.encode('utf-8'))
+    if rule is not None and rule != LETTER_RULE:
+        digest.update(rule.describe().encode('utf-8'))
+    # Exactly the names the builder receives; node order decides how ties are listed
+    # in the reports, so it is part of the key
+    for name in dict.fromkeys(names):
+        digest.update(name.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def graph_fingerprint(G):
+    # Content hash of an arbitrary graph, for caches keyed on more than the name set
+    digest = hashlib.sha256(f'graph-v{CACHE_VERSION}'.encode('utf-8'))
+    digest.update(b'directed' if G.is_directed() else b'undirected')
+    for node in sorted(map(str, G.nodes())):
+        digest.update(node.encode('utf-8'))
+        digest.update(b'\0')
+    digest.update(b'\1')
+    for source, target in sorted((str(u), str(v)) for u, v in G.edges()):
+        digest.update(source.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(target.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def load_chain_graph(names, cache_dir=DEFAULT_CACHE_DIR, rebuild=False, rule=None):
+    """Return (G, buckets) for names, reusing the on-disk copy when the fingerprint matches."""
+    with profile('load_chain_graph', names=len(names)) as record:
+        G, buckets = _load_chain_graph(names, cache_dir, rebuild, rule)
+        if record is not None:
+            record['nodes'] = G.number_of_nodes()
+            record['edges'] = G.number_of_edges()
+    return G, buckets
+
+
+def _load_chain_graph(names, cache_dir, rebuild, rule):
+    fingerprint = names_fingerprint(names, rule)
+    cache_path = os.path.join(cache_dir, f'{fingerprint}.pickle')
+
+    if not rebuild and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as f:
+                G, buckets = pickle.load(f)
+            return G, buckets
+        except (OSError, EOFError, pickle.UnpicklingError):
+            # Corrupt or partially written entry, fall through and rebuild it
+            pass
+
+    G, buckets = create_chain_graph(names, rule)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump((G, buckets), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path)
+
+    return G, buckets
+
+
+def load_dataset_graph(*paths, cache_dir=DEFAULT_CACHE_DIR):
+    return load_chain_graph(load_names(*paths), cache_dir=cache_dir)
@@ -0,0 +1,167 @@
+import os
+import pickle
+
+import networkx as nx
+
+from class_betweenness import class_betweenness, is_chain_graph
+from graph_cache import REPO_ROOT, graph_fingerprint
+from profiling import profile
+from vector_analysis import GraphArrays
+
+DEFAULT_METRICS_DIR = os.path.join(REPO_ROOT, '.cache', 'metrics')
+
+# Metrics that are expensive enough to keep on disk between runs
+PERSISTED_METRICS = ('betweenness', 'closeness')
+
+
+class GraphMetrics:
+    """Lazily computed per-graph metrics shared by every analysis.
+
+    Each metric is computed at most once per graph version. The version is the
+    node count, edge count and node set, so swapping one name for another (as a
+    replayed game does) is noticed; call invalidate() after rewiring edges in place
+    without changing any of the three. Betweenness and closeness are also stored
+    on disk when cache_dir is set, keyed by the fingerprint of the graph as it is
+    at each write, so a missed edit can never file values under another graph.
+    """
+
+    def __init__(self, G, cache_dir=DEFAULT_METRICS_DIR):
+        self.G = G
+        self.cache_dir = cache_dir
+        self._values = {}
+        self._version = None
+        self._fingerprint = None
+        self._disk = None
+
+    def invalidate(self):
+        self._values = {}
+        self._version = None
+        self._fingerprint = None
+        self._disk = None
+
+    def _current_version(self):
+        # hash() of the node set is O(nodes), cheap next to any metric it guards
+        return (self.G.number_of_nodes(), self.G.number_of_edges(), hash(frozenset(self.G.nodes())))
+
+    def _sync_version(self):
+        version = self._current_version()
+        if version != self._version:
+            self.invalidate()
+            self._version = version
+
+    def peek(self, name):
+        # A value already held in memory or on disk, without computing it
+        self._sync_version()
+        if name not in self._values and name in PERSISTED_METRICS and self.cache_dir:
+            disk = self._load_disk()
+            if name in disk:
+                self._values[name] = disk[name]
+        return self._values.get(name)
+
+    def preload(self, values):
+        # Adopt metrics computed elsewhere (e.g. in a worker process)
+        self._sync_version()
+        persisted = {name: value for name, value in values.items() if name in PERSISTED_METRICS}
+        if persisted and self.cache_dir:
+            self._save_disk(persisted)
+        self._values.update(values)
+
+    def _get(self, name, compute):
+        self._sync_version()
+
+        if name not in self._values:
+            if name in PERSISTED_METRICS and self.cache_dir:
+                value = self._load_disk().get(name)
+                if value is None:
+                    value = self._compute(name, compute)
+                    self._save_disk({name: value})
+            else:
+                value = self._compute(name, compute)
+            self._values[name] = value
+        return self._values[name]
+
+    def _compute(self, name, compute):
+        with profile(f'metric.{name}', self.G):
+            return compute()
+
+    def _cache_path(self):
+        if self._fingerprint is None:
+            self._fingerprint = graph_fingerprint(self.G)
+        return os.path.join(self.cache_dir, f'{self._fingerprint}.pickle')
+
+    def _load_disk(self):
+        if self._disk is None:
+            self._disk = {}
+            path = self._cache_path()
+            if os.path.exists(path):
+                try:
+                    with open(path, 'rb') as f:
+                        self._disk = pickle.load(f)
+                except (OSError, EOFError, pickle.UnpicklingError):
+                    self._disk = {}
+        return self._disk
+
+    def _save_disk(self, values):
+        fingerprint = graph_fingerprint(self.G)
+        if fingerprint != self._fingerprint:
+            # Edited since the entry was loaded without changing the version: everything
+            # held so far belongs to the old graph, only the new values are current
+            version = self._version
+            self.invalidate()
+            self._version = version
+            self._fingerprint = fingerprint
+        self._load_disk().update(values)
+
+        path = self._cache_path()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self._disk, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @property
+    def in_degree(self):
+        return self._get('in_degree', lambda: dict(self.G.in_degree()))
+
+    @property
+    def out_degree(self):
+        return self._get('out_degree', lambda: dict(self.G.out_degree()))
+
+    @property
+    def degree_centrality(self):
+        return self._get('degree_centrality', lambda: nx.degree_centrality(self.G))
+
+    @property
+    def betweenness(self):
+        return self._get('betweenness', self._compute_betweenness)
+
+    def _compute_betweenness(self):
+        # Chain graphs collapse to at most 26 * 26 letter classes with the same result
+        if is_chain_graph(self.G):
+            return class_betweenness(self.G)
+        return nx.betweenness_centrality(self.G)
+
+    @property
+    def closeness(self):
+        return self._get('closeness', lambda: nx.closeness_centrality(self.G))
+
+    @property
+    def sinks(self):
+        return self._get('sinks', lambda: {node for node, degree in self.out_degree.items() if degree == 0})
+
+    @property
+    def sccs(self):
+        return self._get('sccs', lambda: list(nx.strongly_connected_components(self.G)))
+
+    @property
+    def wccs(self):
+        return self._get('wccs', lambda: list(nx.weakly_connected_components(self.G)))
+
+    @property
+    def arrays(self):
+        return self._get('arrays', lambda: GraphArrays(self.G))
+
+
+def get_metrics(G, metrics=None):
+    # Analyses accept an optional shared GraphMetrics and fall back to a private one
+    return metrics if metrics is not None else GraphMetrics(G, cache_dir=None)
@@ -0,0 +1,164 @@
+import networkx as nx
+
+from chain_graph import build_letter_buckets, create_chain_graph
+from chain_rules import LETTER_RULE
+
+
+class IncrementalChainGraph:
+    """Chain graph that absorbs single-name inserts and deletes without a rebuild.
+
+    Edges, letter buckets, the sink set and the edge count are updated by touching
+    only the buckets of the name's first and last letter (its head and tail under
+    `rule`). SCC membership is derived from the letter graph: two different names a
+    and b are joined by a path exactly when last(a) reaches first(b) among letters,
+    so the name SCCs are the groups of names whose first and last letters share a
+    letter SCC. Names too short for the rule sit outside the buckets as isolated
+    sinks.
+    """
+
+    def __init__(self, names=(), keep_graph=True, rule=None):
+        names = list(dict.fromkeys(names))
+        self.rule = rule or LETTER_RULE
+        if keep_graph:
+            self.G, buckets = create_chain_graph(names, self.rule)
+        else:
+            self.G = None
+            buckets = build_letter_buckets(names, self.rule)
+        self.unchained = {name: None for name in names if self.rule.head(name) is None}
+
+        # Insertion-ordered dicts double as O(1) removable sets
+        self.first = {letter: dict.fromkeys(group) for letter, group in buckets['first'].items()}
+        self.last = {letter: dict.fromkeys(group) for letter, group in buckets['last'].items()}
+        self.pair = {pair: dict.fromkeys(group) for pair, group in buckets['pair'].items()}
+
+        self.edge_count = sum(self.out_degree(name) for name in names)
+        self.sinks = {name for name in names if self.out_degree(name) == 0}
+        self._letter_scc = None
+
+    def _letters(self, name):
+        return self.rule.head(name), self.rule.tail(name)
+
+    def __contains__(self, name):
+        pair = self.pair.get(self._letters(name))
+        return name in self.unchained or (pair is not None and name in pair)
+
+    def __len__(self):
+        return sum(len(group) for group in self.pair.values()) + len(self.unchained)
+
+    def out_degree(self, name):
+        first, last = self._letters(name)
+        if first is None:
+            return 0
+        return len(self.first.get(last, ())) - (first == last)
+
+    def in_degree(self, name):
+        first, last = self._letters(name)
+        if first is None:
+            return 0
+        return len(self.last.get(first, ())) - (first == last)
+
+    def successors(self, name):
+        return (target for target in self.first.get(self._letters(name)[1], ()) if target != name)
+
+    def predecessors(self, name):
+        return (source for source in self.last.get(self._letters(name)[0], ()) if source != name)
+
+    def add(self, name):
+        if name in self:
+            return
+        first, last = self._letters(name)
+        if first is None:
+            if self.G is not None:
+                self.G.add_node(name)
+            self.unchained[name] = None
+            self.sinks.add(name)
+            return
+
+        if self.G is not None:
+            self.G.add_node(name)
+            self.G.add_edges_from((source, name) for source in self.last.get(first, ()))
+            self.G.add_edges_from((name, target) for target in self.first.get(last, ()))
+
+        # Names ending in `first` gain an edge into the new name and stop being sinks
+        self.sinks.difference_update(self.last.get(first, ()))
+
+        if (first, last) not in self.pair:
+            self._letter_scc = None
+        self.first.setdefault(first, {})[name] = None
+        self.last.setdefault(last, {})[name] = None
+        self.pair.setdefault((first, last), {})[name] = None
+
+        self.edge_count += self.out_degree(name) + self.in_degree(name)
+        if self.out_degree(name) == 0:
+            self.sinks.add(name)
+
+    def remove(self, name):
+        if name not in self:
+            return
+        if name in self.unchained:
+            if self.G is not None:
+                self.G.remove_node(name)
+            del self.unchained[name]
+            self.sinks.discard(name)
+            return
+        first, last = self._letters(name)
+        self.edge_count -= self.out_degree(name) + self.in_degree(name)
+
+        if self.G is not None:
+            self.G.remove_node(name)
+
+        del self.first[first][name]
+        del self.last[last][name]
+        del self.pair[(first, last)][name]
+        if not self.first[first]:
+            del self.first[first]
+        if not self.last[last]:
+            del self.last[last]
+        if not self.pair[(first, last)]:
+            del self.pair[(first, last)]
+            self._letter_scc = None
+        self.sinks.discard(name)
+
+        # Names ending in `first` may have lost their last outgoing edge
+        for source in self.last.get(first, ()):
+            if self.out_degree(source) == 0:
+                self.sinks.add(source)
+
+    def play(self, names):
+        # Replay a sequence of moves: every played name leaves the graph
+        for name in names:
+            self.remove(name)
+
+    def letter_clusters(self):
+        return {letter: list(group) for letter, group in self.first.items()}
+
+    def last_letter_clusters(self):
+        return {letter: list(group) for letter, group in self.last.items()}
+
+    def _letter_components(self):
+        if self._letter_scc is None:
+            letter_graph = nx.DiGraph()
+            letter_graph.add_edges_from(self.pair)
+            self._letter_scc = {}
+            for label, component in enumerate(nx.strongly_connected_components(letter_graph)):
+                for letter in component:
+                    self._letter_scc[letter] = label
+        return self._letter_scc
+
+    def scc_of(self, name):
+        # Letter-SCC label shared by the name's SCC, or the name itself for a singleton
+        if name in self.unchained:
+            return name
+        components = self._letter_components()
+        first, last = self._letters(name)
+        if components[first] == components[last]:
+            return components[first]
+        return name
+
+    def strongly_connected_components(self):
+        groups = {}
+        for (first, last), names in self.pair.items():
+            for name in names:
+                groups.setdefault(self.scc_of(name), set()).add(name)
+        groups.update((name, {name}) for name in self.unchained)
+        return list(groups.values())
@@ -0,0 +1,218 @@
+import time
+from collections import defaultdict
+
+from chain_rules import graph_rule
+from graph_cache import COUNTRIES_PATH, DATASET_PATHS, load_chain_graph, load_names
+
+# How many search nodes are expanded between two looks at the clock
+_CLOCK_INTERVAL = 1024
+
+
+class LongestChainSearch:
+    """Branch-and-bound search for the longest chain (longest simple path) in a chain graph.
+
+    A chain is a trail in the letter multigraph that has one edge first -> last per
+    name, so names sharing a (first letter, last letter) pair are interchangeable and
+    the search branches on pair classes instead of names. Three things keep it small:
+
+    - names that start and end on the current letter are always played at once,
+      since moving them to the front of any chain through that letter is free;
+    - a position is the current letter plus the remaining count of every class,
+      packed into one int, and each position is expanded only once;
+    - a branch is cut when even an Euler trail through every edge reachable from
+      the current letter, less the edges its degree imbalance forces out, could
+      not beat the best chain found so far.
+
+    Under another chain rule the letters are the heads and tails the rule on G
+    gives; a name too short for it is a chain of its own. With a time budget the
+    best chain found so far is returned when it runs out.
+    """
+
+    def __init__(self, G):
+        self.rule = graph_rule(G)
+        classes = defaultdict(list)
+        self.unchained = []
+        for name in G.nodes():
+            first = self.rule.head(name)
+            if first is None:
+                self.unchained.append(name)
+            else:
+                classes[(first, self.rule.tail(name))].append(name)
+
+        self.pairs = sorted(classes)
+        self.names = [classes[pair] for pair in self.pairs]
+        self.letters = sorted({letter for pair in self.pairs for letter in pair})
+        letter_index = {letter: i for i, letter in enumerate(self.letters)}
+
+        self.source = [letter_index[first] for first, _ in self.pairs]
+        self.target = [letter_index[last] for _, last in self.pairs]
+        self.moves_from = [[] for _ in self.letters]
+        self.loop_class = [None] * len(self.letters)
+        for i, (first, last) in enumerate(self.pairs):
+            self.moves_from[self.source[i]].append(i)
+            if first == last:
+                self.loop_class[self.source[i]] = i
+
+        # Bit-field layout of the packed position, one field per class
+        self.unit = []
+        offset = 0
+        for names in self.names:
+            self.unit.append(1 << offset)
+            offset += len(names).bit_length()
+
+        self.nodes_expanded = 0
+
+    def _reset(self):
+        self.counts = [len(names) for names in self.names]
+        self.out_remaining = [0] * len(self.letters)
+        for i, count in enumerate(self.counts):
+            self.out_remaining[self.source[i]] += count
+        self.state = sum(count * unit for count, unit in zip(self.counts, self.unit))
+        self.path = []
+        self.length = 0
+        self.best = []
+        self.best_length = 0
+        self.seen = set()
+        self.complete = True
+        self.nodes_expanded = 0
+
+    def _take(self, i, count):
+        self.counts[i] -= count
+        self.out_remaining[self.source[i]] -= count
+        self.state -= count * self.unit[i]
+        self.path.append((i, count))
+        self.length += count
+
+    def _undo(self):
+        i, count = self.path.pop()
+        self.counts[i] += count
+        self.out_remaining[self.source[i]] += count
+        self.state += count * self.unit[i]
+        self.length -= count
+
+    def upper_bound(self, letter):
+        """Most names any chain continuing from `letter` (an index) can still use."""
+        reached = {letter}
+        stack = [letter]
+        while stack:
+            u = stack.pop()
+            for i in self.moves_from[u]:
+                if self.counts[i] and self.target[i] not in reached:
+                    reached.add(self.target[i])
+                    stack.append(self.target[i])
+
+        edges = 0
+        balance = [0] * len(self.letters)
+        for u in reached:
+            for i in self.moves_from[u]:
+                count = self.counts[i]
+                if count:
+                    edges += count
+                    balance[u] += count
+                    balance[self.target[i]] -= count
+
+        # A trail leaves at most one letter with surplus out-edges and one with surplus
+        # in-edges; every dropped edge fixes at most two units of imbalance
+        imbalance = sum(abs(b) for b in balance)
+        return edges - max(0, imbalance // 2 - 1)
+
+    def _moves(self, letter):
+        loop = self.loop_class[letter]
+        if loop is not None and self.counts[loop]:
+            return [loop]
+        moves = [i for i in self.moves_from[letter] if self.counts[i]]
+        # Head for letters with the most names left to play first
+        moves.sort(key=lambda i: -self.out_remaining[self.target[i]])
+        return moves
+
+    def _run(self, letter, deadline):
+        base = len(self.path)
+        frames = [[letter, self._moves(letter), 0]]
+        while frames:
+            frame = frames[-1]
+            _, moves, position = frame
+            if position == len(moves):
+                frames.pop()
+                if len(self.path) > base:
+                    self._undo()
+                continue
+            frame[2] += 1
+
+            i = moves[position]
+            self._take(i, self.counts[i] if self.source[i] == self.target[i] else 1)
+            self.nodes_expanded += 1
+            if self.length > self.best_length:
+                self.best_length = self.length
+                self.best = list(self.path)
+
+            if deadline is not None and self.nodes_expanded % _CLOCK_INTERVAL == 0 \
+                    and time.perf_counter() > deadline:
+                self.complete = False
+                while len(self.path) > base:
+                    self._undo()
+                return
+
+            next_letter = self.target[i]
+            key = (next_letter, self.state)
+            if key in self.seen or self.length + self.upper_bound(next_letter) <= self.best_length:
+                self._undo()
+                continue
+            self.seen.add(key)
+            frames.append([next_letter, self._moves(next_letter), 0])
+
+    def _chain(self, first_name=None):
+        # Turn the best class sequence back into names
+        pools = [list(names) for names in self.names]
+        if first_name is not None:
+            pool = pools[self.best[0][0]]
+            pool.insert(0, pool.pop(pool.index(first_name)))
+        chain = []
+        for i, count in self.best:
+            chain.extend(pools[i][:count])
+            del pools[i][:count]
+        return chain
+
+    def longest_from(self, name, time_budget=None):
+        """Longest chain opening with `name`, as (chain, complete).
+
+        complete is False when the time budget ran out before the search space was
+        exhausted; chain is then the best one found.
+        """
+        if self.rule.head(name) is None:
+            return [name], True
+        deadline = time.perf_counter() + time_budget if time_budget is not None else None
+        self._reset()
+        i = self.pairs.index((self.rule.head(name), self.rule.tail(name)))
+        self._take(i, 1)
+        self.best = list(self.path)
+        self.best_length = self.length
+        self._run(self.target[i], deadline)
+        return self._chain(name), self.complete
+
+    def longest_chain(self, time_budget=None):
+        """Longest chain from any opening name, as (chain, complete)."""
+        deadline = time.perf_counter() + time_budget if time_budget is not None else None
+        self._reset()
+        bounds = sorted(((self.upper_bound(letter), letter) for letter in range(len(self.letters))), reverse=True)
+        for bound, letter in bounds:
+            if bound <= self.best_length:
+                break
+            self._run(letter, deadline)
+            if not self.complete:
+                break
+        return self._chain() or self.unchained[:1], self.complete
+
+
+def main():
+    for label, paths in (("countries", (COUNTRIES_PATH,)), ("countries and cities", DATASET_PATHS)):
+        G, _ = load_chain_graph(load_names(*paths))
+        search = LongestChainSearch(G)
+        chain, complete = search.longest_chain(time_budget=10)
+        status = "optimal" if complete else "best found within the time budget"
+        print(f"Longest chain through the {label} ({len(chain)} names, {status}):")
+        print(" -> ".join(chain))
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import contextlib
+import io
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from analyse import REPORT_SECTIONS
+from graph_cache import DATASET_PATHS, load_chain_graph, load_names
+from graph_metrics import GraphMetrics
+from profiling import adopt_worker_records, profile, worker_profile, worker_settings
+
+# Graph shipped to each worker once through the pool initializer
+_worker_graph = None
+
+
+def _init_worker(G):
+    global _worker_graph
+    _worker_graph = G
+
+
+def _compute_metric(name, profiling):
+    # Returns the value with the worker's profile records
+    with worker_profile(profiling) as records:
+        value = getattr(GraphMetrics(_worker_graph, cache_dir=None), name)
+    return value, records
+
+
+def _run_section(index, values, profiling):
+    section, _ = REPORT_SECTIONS[index]
+    metrics = GraphMetrics(_worker_graph, cache_dir=None)
+    metrics.preload(values)
+
+    buffer = io.StringIO()
+    with worker_profile(profiling) as records:
+        with contextlib.redirect_stdout(buffer), profile(section.__name__, _worker_graph):
+            section(_worker_graph, metrics)
+    return buffer.getvalue(), records
+
+
+def run_report(G, sections=REPORT_SECTIONS, workers=None, metrics=None):
+    """Run the analyse.py report sections concurrently and return their output in order.
+
+    Each prerequisite metric is computed once, in its own worker, and handed to every
+    section that declared it. A section starts as soon as its prerequisites are ready.
+    Metrics already cached on disk are reused and new ones are written back. When
+    profiling is on, every worker profiles its metric or section and the records are
+    merged under the run_report stage, tagged with the worker's pid.
+    """
+    if metrics is None:
+        metrics = GraphMetrics(G)
+    indexes = [REPORT_SECTIONS.index(section) for section in sections]
+
+    required = list(dict.fromkeys(name for _, requires in sections for name in requires))
+    values = {}
+    for name in required:
+        value = metrics.peek(name)
+        if value is not None:
+            values[name] = value
+    computed = {}
+    profiling = worker_settings()
+
+    outputs = {}
+    # Work done in the workers shows up in wall time only, not in CPU time or memory
+    with profile('run_report', G, sections=len(indexes), workers=workers or os.cpu_count()), \
+            ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                initializer=_init_worker, initargs=(G,)) as pool:
+        metric_futures = {pool.submit(_compute_metric, name, profiling): name
+                          for name in required if name not in values}
+        section_futures = {}
+        pending = list(indexes)
+
+        def submit_ready():
+            for index in list(pending):
+                requires = REPORT_SECTIONS[index][1]
+                if all(name in values for name in requires):
+                    section_futures[index] = pool.submit(_run_section, index,
+                                                         {name: values[name] for name in requires}, profiling)
+                    pending.remove(index)
+
+        submit_ready()
+        while metric_futures:
+            done, _ = wait(metric_futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = metric_futures.pop(future)
+                value, records = future.result()
+                values[name] = computed[name] = value
+                adopt_worker_records(records)
+            submit_ready()
+
+        for index, future in section_futures.items():
+            outputs[index], records = future.result()
+            adopt_worker_records(records)
+
+    metrics.preload(computed)
+    return ''.join(outputs[index] for index in indexes)
+
+
+def main():
+    countries = load_names(*DATASET_PATHS)
+    G, _ = load_chain_graph(countries)
+    print(run_report(G), end='')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+# The one active Profiler, or None; profile() is a shared no-op context while it is None
+_active = None
+_DISABLED = contextlib.nullcontext()
+
+
+class Profiler:
+    """Records wall time, CPU time, peak traced memory and input sizes per stage.
+
+    Stages nest: a stage's figures include everything run inside it, and each
+    record keeps the name of its enclosing stage. Peak memory is measured with
+    tracemalloc relative to the memory already traced when the stage started.
+    """
+
+    def __init__(self, track_memory=True):
+        self.track_memory = track_memory
+        self.records = []
+        self._stack = []
+        self.started = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        self._started_tracing = False
+
+    def start(self):
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextlib.contextmanager
+    def stage(self, name, G=None, **sizes):
+        record = {'name': name, 'parent': self._stack[-1]['record']['name'] if self._stack else None}
+        record.update(sizes)
+        if G is not None:
+            record['nodes'] = G.number_of_nodes()
+            record['edges'] = G.number_of_edges()
+
+        frame = {'record': record, 'memory_start': 0, 'peak': 0}
+        if self.track_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            frame['memory_start'] = frame['peak'] = current
+        self._stack.append(frame)
+        self.records.append(record)
+
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall_seconds'] = time.perf_counter() - wall
+            record['cpu_seconds'] = time.process_time() - cpu
+            self._stack.pop()
+            if self.track_memory:
+                peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+                record['peak_memory_bytes'] = peak - frame['memory_start']
+                if self._stack:
+                    self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+
+    def adopt(self, records, **tags):
+        # Records profiled in another process; their top-level stages nest under the current one
+        parent = self._stack[-1]['record']['name'] if self._stack else None
+        for record in records:
+            record = dict(record, **tags)
+            if record['parent'] is None:
+                record['parent'] = parent
+            self.records.append(record)
+
+    def to_dict(self):
+        return {
+            'started': self.started,
+            'python': platform.python_version(),
+            'argv': sys.argv,
+            'track_memory': self.track_memory,
+            'stages': self.records,
+        }
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+            f.write('\n')
+
+
+def enable(track_memory=True):
+    global _active
+    _active = Profiler(track_memory=track_memory)
+    _active.start()
+    return _active
+
+
+def disable():
+    global _active
+    profiler, _active = _active, None
+    if profiler is not None:
+        profiler.stop()
+    return profiler
+
+
+def worker_settings():
+    # What a worker process needs to profile its share of the work: track_memory, or None when off
+    return None if _active is None else _active.track_memory
+
+
+@contextlib.contextmanager
+def worker_profile(settings):
+    """Profile a task in a worker process; yields the list its records end up in.
+
+    settings comes from worker_settings() in the parent, which passes the list back
+    to adopt_worker_records() once the task returns. Each record carries the
+    worker's pid as 'process'.
+    """
+    records = []
+    if settings is None:
+        yield records
+        return
+    enable(track_memory=settings)
+    try:
+        yield records
+    finally:
+        records.extend(dict(record, process=os.getpid()) for record in disable().records)
+
+
+def adopt_worker_records(records, **tags):
+    if _active is not None and records:
+        _active.adopt(records, **tags)
+
+
+def profile(name, G=None, **sizes):
+    """Context manager timing one stage when profiling is on; yields the record or None."""
+    if _active is None:
+        return _DISABLED
+    return _active.stage(name, G, **sizes)
+
+
+@contextlib.contextmanager
+def profiled_run(path, track_memory=True):
+    # Profile everything inside the block and write the JSON profile to `path`; no-op without a path
+    if not path:
+        yield None
+        return
+    profiler = enable(track_memory=track_memory)
+    try:
+        yield profiler
+    finally:
+        disable()
+        profiler.write(path)
@@ -0,0 +1,229 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+from collections import Counter, deque
+
+from chain_graph import build_letter_buckets
+from chain_rules import graph_rule
+from elimination import elimination_distances
+
+# Latencies kept for the percentile counters
+LATENCY_WINDOW = 10000
+
+# Longest request line accepted (asyncio's default stream limit is 64 KiB); larger
+# batches are answered with an error
+MAX_LINE_BYTES = 16 * 1024 * 1024
+
+
+def _field(request, key):
+    try:
+        return request[key]
+    except KeyError:
+        raise KeyError(f"missing field {key!r}") from None
+
+
+class QueryIndex:
+    """Everything the query server answers from, built once at start-up.
+
+    Moves and degrees come straight from the letter buckets; elimination distances
+    and communities are precomputed per name.
+    """
+
+    def __init__(self, G, buckets=None, communities=None, rule=None):
+        self.rule = rule or graph_rule(G)
+        self.buckets = buckets if buckets is not None else build_letter_buckets(G.nodes(), self.rule)
+        self.names = set(G.nodes())
+        self.distances, _ = elimination_distances(G)
+        self.communities = communities or {}
+
+    def _check(self, name):
+        if name not in self.names:
+            raise KeyError(f"unknown name: {name!r}")
+
+    def next_names(self, name, used=()):
+        # Legal replies to `name` once every name in `used` has been played
+        self._check(name)
+        used = set(used)
+        used.add(name)
+        return [target for target in self.buckets['first'].get(self.rule.tail(name), ()) if target not in used]
+
+    def degree(self, name):
+        self._check(name)
+        first, last = self.rule.head(name), self.rule.tail(name)
+        if first is None:
+            return {'out': 0, 'in': 0}
+        return {
+            'out': len(self.buckets['first'].get(last, ())) - (first == last),
+            'in': len(self.buckets['last'].get(first, ())) - (first == last),
+        }
+
+    def elimination(self, name):
+        # Fewest moves to a dead end, or None when no dead end is reachable
+        self._check(name)
+        return self.distances.get(name)
+
+    def community(self, name):
+        self._check(name)
+        return self.communities.get(name)
+
+
+class QueryServer:
+    """asyncio server answering newline-delimited JSON queries against a QueryIndex.
+
+    Each line is one request object, e.g. {"id": 1, "op": "next", "name": "Chad",
+    "used": ["Denmark"]}, or a JSON list of them answered with a list. Responses are
+    written in request order, so clients may pipeline any number of lines without
+    waiting. Ops: next, degree, elimination, community, stats, ping. A line longer
+    than max_line_bytes is skipped and answered with an error.
+    """
+
+    def __init__(self, index, max_line_bytes=MAX_LINE_BYTES):
+        self.index = index
+        self.max_line_bytes = max_line_bytes
+        self.ops = {
+            'next': lambda request: self.index.next_names(_field(request, 'name'), request.get('used', ())),
+            'degree': lambda request: self.index.degree(_field(request, 'name')),
+            'elimination': lambda request: self.index.elimination(_field(request, 'name')),
+            'community': lambda request: self.index.community(_field(request, 'name')),
+            'stats': lambda request: self.stats(),
+            'ping': lambda request: 'pong',
+        }
+        self.started = time.perf_counter()
+        self.requests = Counter()
+        self.errors = 0
+        self.connections = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def answer(self, request):
+        start = time.perf_counter_ns()
+        response = {'id': request.get('id')} if isinstance(request, dict) else {'id': None}
+        try:
+            if not isinstance(request, dict):
+                raise TypeError("request must be a JSON object")
+            op = request.get('op')
+            if op not in self.ops:
+                raise KeyError(f"unknown op {op!r}, expected one of: {', '.join(self.ops)}")
+            response['result'] = self.ops[op](request)
+            self.requests[op] += 1
+        except (KeyError, TypeError) as exc:
+            self.errors += 1
+            response['error'] = str(exc.args[0]) if exc.args else type(exc).__name__
+        self.latencies.append(time.perf_counter_ns() - start)
+        return response
+
+    def handle_line(self, line):
+        try:
+            request = json.loads(line)
+        except ValueError as exc:
+            self.errors += 1
+            return {'id': None, 'error': f"invalid JSON: {exc}"}
+        if isinstance(request, list):
+            return [self.answer(item) for item in request]
+        return self.answer(request)
+
+    def stats(self):
+        total = sum(self.requests.values())
+        elapsed = time.perf_counter() - self.started
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] / 1000 if latencies else None
+
+        return {
+            'requests': dict(self.requests),
+            'errors': self.errors,
+            'connections': self.connections,
+            'uptime_seconds': elapsed,
+            'requests_per_second': total / elapsed if elapsed else 0.0,
+            'latency_us': {
+                'mean': sum(latencies) / len(latencies) / 1000 if latencies else None,
+                'p50': percentile(0.5),
+                'p99': percentile(0.99),
+                'max': latencies[-1] / 1000 if latencies else None,
+            },
+        }
+
+    async def _read_line(self, reader):
+        # The next request line, b'' at end of stream, or None for a line over the limit
+        try:
+            return await reader.readuntil(b'\n')
+        except asyncio.IncompleteReadError as exc:
+            return exc.partial
+        except asyncio.LimitOverrunError:
+            pass
+
+        # Drop the rest of the long line; readuntil left it in the buffer
+        while True:
+            try:
+                await reader.readuntil(b'\n')
+                return None
+            except asyncio.LimitOverrunError as exc:
+                await reader.readexactly(exc.consumed)
+            except asyncio.IncompleteReadError:
+                return None
+
+    async def handle_connection(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                line = await self._read_line(reader)
+                if line is None:
+                    self.errors += 1
+                    response = {'id': None, 'error': f"request line longer than {self.max_line_bytes} bytes"}
+                    writer.write(json.dumps(response).encode('utf-8') + b'\n')
+                elif not line:
+                    break
+                elif line.strip():
+                    writer.write(json.dumps(self.handle_line(line)).encode('utf-8') + b'\n')
+                # Returns at once unless the client has stopped reading and the buffer is full
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, path=None, host='127.0.0.1', port=8765):
+        limit = self.max_line_bytes
+        if path:
+            server = await asyncio.start_unix_server(self.handle_connection, path=path, limit=limit)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host=host, port=port, limit=limit)
+        async with server:
+            await server.serve_forever()
+
+
+def query(requests, path=None, host='127.0.0.1', port=8765):
+    """Send requests to a running server over one connection, pipelined, and return the responses."""
+    if path:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(path)
+    else:
+        connection = socket.create_connection((host, port))
+
+    def send():
+        # Writes run in their own thread so a long pipeline cannot stall against the replies
+        with connection.makefile('wb') as stream:
+            for request in requests:
+                stream.write(json.dumps(request).encode('utf-8') + b'\n')
+
+    with connection, connection.makefile('rb') as stream:
+        sender = threading.Thread(target=send)
+        sender.start()
+        responses = [json.loads(stream.readline()) for _ in requests]
+        sender.join()
+    return responses
+
+
+def main():
+    from graph_cache import COUNTRIES_PATH, load_chain_graph, load_names
+
+    G, buckets = load_chain_graph(load_names(COUNTRIES_PATH))
+    server = QueryServer(QueryIndex(G, buckets))
+    print("Serving on 127.0.0.1:8765")
+    asyncio.run(server.serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import numpy as np
+
+from chain_rules import graph_rule
+from graph_cache import COUNTRIES_PATH, load_chain_graph, load_names
+
+
+class MoveRecommender:
+    """Ranks the legal moves of many game states at once.
+
+    A state is the list of names played so far; the next name must start with the
+    last letter of the final one (any name opens an empty game). Names are laid out
+    by (first letter, last letter) bucket, so a batch of states is a boolean matrix
+    whose contiguous column ranges are the buckets, and one reduceat turns it into a
+    (states x letters x letters) count tensor. Every score below is array arithmetic
+    on that tensor:
+
+    - replies: how many names the opponent can answer the move with (1 ply);
+    - worst_case: after the opponent's most restrictive reply, how many names we can
+      still play (2 ply); None when the opponent has no reply at all.
+
+    Moves that leave no reply win outright and rank first. Moves that let the
+    opponent leave us stuck (worst_case 0) rank last. The rest are ordered by fewest
+    replies, then by the highest worst_case.
+
+    Under another chain rule the letters are the heads and tails the rule on G
+    gives. Names too short for it stay out of the buckets: nothing can follow them,
+    so they only show up as openings the opponent cannot answer.
+    """
+
+    def __init__(self, G):
+        self.rule = graph_rule(G)
+        classes = {}
+        self.unchained = []
+        for name in G.nodes():
+            first = self.rule.head(name)
+            if first is None:
+                self.unchained.append(name)
+            else:
+                classes.setdefault((first, self.rule.tail(name)), []).append(name)
+
+        self.letters = sorted({letter for pair in classes for letter in pair})
+        self.letter_index = {letter: i for i, letter in enumerate(self.letters)}
+        self.pairs = sorted(classes)
+
+        self.names = [name for pair in self.pairs for name in classes[pair]]
+        self.column = {name: i for i, name in enumerate(self.names)}
+        sizes = np.array([len(classes[pair]) for pair in self.pairs], dtype=np.int64)
+        self.ends = np.cumsum(sizes)
+        self.starts = self.ends - sizes
+        self.pair_first = np.array([self.letter_index[first] for first, _ in self.pairs])
+        self.pair_last = np.array([self.letter_index[last] for _, last in self.pairs])
+        self.pair_index = {pair: i for i, pair in enumerate(self.pairs)}
+
+    def state_masks(self, states):
+        """Available-name matrix and current-letter vector for a batch of states.
+
+        The current letter is -1 for an opening and -2 after a name too short for
+        the rule, which nothing can follow.
+        """
+        available = np.ones((len(states), len(self.names)), dtype=bool)
+        current = np.full(len(states), -1, dtype=np.int64)
+        for row, played in enumerate(states):
+            played = list(played)
+            if played:
+                available[row, [self.column[name] for name in played if name in self.column]] = False
+                last = self.rule.tail(played[-1])
+                current[row] = -2 if last is None else self.letter_index[last]
+        return available, current
+
+    def bucket_counts(self, available):
+        A = len(self.letters)
+        counts = np.zeros((len(available), A, A), dtype=np.int32)
+        if not self.pairs:
+            return counts
+        counts[:, self.pair_first, self.pair_last] = np.add.reduceat(available, self.starts, axis=1, dtype=np.int32)
+        return counts
+
+    def score(self, counts, current):
+        """Per-state move scores indexed [state, last letter of the move].
+
+        current must be a letter index for every row. Returns (legal, replies,
+        worst_case) where worst_case is len(names) + 1 for moves with no reply.
+        """
+        rows = np.arange(len(current))
+        A = len(self.letters)
+        letters = np.arange(A)
+
+        starting = counts.sum(axis=2)
+        legal = counts[rows, current] > 0
+
+        # The move removes one name from bucket (current, l1)
+        replies = starting - (letters[None, :] == current[:, None])
+
+        # Opponent's replies l1 -> l2, less the move itself when it was (current, current)
+        reply_counts = counts.copy()
+        reply_counts[rows, current, current] -= 1
+        ours = (starting[:, None, :]
+                - (letters[None, None, :] == current[:, None, None])
+                - np.eye(A, dtype=np.int32)[None, :, :])
+
+        no_reply = len(self.names) + 1
+        worst_case = np.where(reply_counts > 0, ours, no_reply).min(axis=2, initial=no_reply)
+        return legal, replies, worst_case
+
+    def _move_name(self, available_row, first, last):
+        k = self.pair_index[(self.letters[first], self.letters[last])]
+        start = self.starts[k]
+        return self.names[start + int(np.argmax(available_row[start:self.ends[k]]))]
+
+    def recommend(self, states, k=3):
+        """Top-k moves for each state as [(name, replies, worst_case), ...]."""
+        available, current = self.state_masks(states)
+        counts = self.bucket_counts(available)
+
+        # An opening may start with any letter: score it once per letter and merge
+        openings = np.flatnonzero(current == -1)
+        A = len(self.letters)
+        rows = np.concatenate((np.flatnonzero(current >= 0), np.repeat(openings, A)))
+        letters = np.concatenate((current[current >= 0], np.tile(np.arange(A), len(openings))))
+        legal, replies, worst_case = self.score(counts[rows], letters)
+
+        no_reply = len(self.names) + 1
+        candidates = [[] for _ in states]
+        for position, (row, first) in enumerate(zip(rows.tolist(), letters.tolist())):
+            for last in np.flatnonzero(legal[position]).tolist():
+                worst = int(worst_case[position, last])
+                reply_count = int(replies[position, last])
+                key = (worst != no_reply, worst == 0, reply_count, -worst)
+                candidates[row].append((key, first, last, reply_count, worst))
+        # Openings with a name too short for the rule leave no reply; first -1 marks them
+        for row in openings.tolist():
+            candidates[row].extend(((False, False, 0, -no_reply), -1, j, 0, no_reply) for j in range(len(self.unchained)))
+
+        results = []
+        for row, moves in enumerate(candidates):
+            moves.sort()
+            results.append([
+                (self.unchained[last] if first < 0 else self._move_name(available[row], first, last),
+                 reply_count, None if worst == no_reply else worst)
+                for _, first, last, reply_count, worst in moves[:k]
+            ])
+        return results
+
+
+def main():
+    G, _ = load_chain_graph(load_names(COUNTRIES_PATH))
+    recommender = MoveRecommender(G)
+
+    states = [[], ['Chad'], ['Germany', 'Yemen'], ['Egypt', 'Tuvalu', 'Uganda']]
+    for played, moves in zip(states, recommender.recommend(states)):
+        print(f"After {' -> '.join(played) or 'nothing'}:")
+        for name, replies, worst_case in moves:
+            outcome = "opponent has no reply" if worst_case is None else f"at least {worst_case} answers left for us"
+            print(f"  {name}: {replies} replies for the opponent, {outcome}")
+
+
+if __name__ == "__main__":
+    main()
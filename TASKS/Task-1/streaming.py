@@ -0,0 +1,214 @@
+import csv
+import heapq
+import re
+from collections import Counter
+
+_NUMBERED_LINE = re.compile(r'^\s*\d+\.\s+(.+?)\s*$')
+_QUOTED_NAME = re.compile(r"'([^']+)'")
+
+
+def _iter_text_names(f):
+    # The first non-blank line decides the layout used in dataset/
+    mode = None
+    for line in f:
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if mode is None:
+            if _NUMBERED_LINE.match(stripped):
+                mode = 'numbered'     # "1. Afghanistan" (cleaned_countries.txt)
+            elif stripped.startswith('['):
+                mode = 'quoted'       # printed numpy array (cities.txt)
+            else:
+                mode = 'plain'        # one name per line
+
+        if mode == 'numbered':
+            match = _NUMBERED_LINE.match(stripped)
+            if match:
+                yield match.group(1)
+        elif mode == 'quoted':
+            for name in _QUOTED_NAME.findall(stripped):
+                yield name.strip()
+        else:
+            yield stripped
+
+
+def iter_names(path, column='city'):
+    """Yield stripped names from a CSV column or a text listing without loading the file."""
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith('.csv'):
+            reader = csv.reader(f)
+            header = next(reader, [])
+            position = header.index(column)
+            for row in reader:
+                if len(row) > position and row[position].strip():
+                    yield row[position].strip()
+        else:
+            yield from _iter_text_names(f)
+
+
+def iter_name_chunks(paths, chunk_size=100000, column='city'):
+    chunk = []
+    for path in paths:
+        for name in iter_names(path, column=column):
+            chunk.append(name)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+class StreamingLetterIndex:
+    """First/last letter counts of a name stream, enough to reproduce the letter-level
+    analyses without building the graph.
+
+    A name starting with f and ending with l has out-degree first[l] and in-degree
+    last[f] in the chain graph, minus one when f == l (no self-edges). Memory is
+    bounded by the number of distinct letter pairs, not by names or edges. Unlike
+    the graph, repeated names are counted every time they appear.
+    """
+
+    def __init__(self):
+        self.first = Counter()
+        self.last = Counter()
+        self.pairs = Counter()
+        self.names = 0
+
+    def add(self, names):
+        for name in names:
+            # Same normalisation as find_last_letter_clusters
+            name = name.strip()
+            if not name:
+                continue
+            first, last = name[0].lower(), name[-1].lower()
+            self.first[first] += 1
+            self.last[last] += 1
+            self.pairs[(first, last)] += 1
+            self.names += 1
+
+    def out_degree(self, first, last):
+        return self.first[last] - (first == last)
+
+    def in_degree(self, first, last):
+        return self.last[first] - (first == last)
+
+    def edge_count(self):
+        return sum(self.pairs[pair] * self.out_degree(*pair) for pair in self.pairs)
+
+    def degree_histogram(self, direction='out'):
+        degree = self.out_degree if direction == 'out' else self.in_degree
+        histogram = Counter()
+        for pair, count in self.pairs.items():
+            histogram[degree(*pair)] += count
+        return dict(sorted(histogram.items()))
+
+    def degree_statistics(self):
+        stats = {'nodes': self.names, 'edges': self.edge_count()}
+        for direction in ('out', 'in'):
+            histogram = self.degree_histogram(direction)
+            if not histogram:
+                continue
+            mean = sum(d * c for d, c in histogram.items()) / self.names
+            stats[f'{direction}_degree'] = {
+                'min': min(histogram),
+                'max': max(histogram),
+                'mean': mean,
+                'variance': sum(c * (d - mean) ** 2 for d, c in histogram.items()) / self.names,
+            }
+        return stats
+
+    def bottleneck_letters(self):
+        # Same shape as find_bottleneck_letters: first-letter counts, rarest first
+        return dict(sorted(self.first.items(), key=lambda x: x[1]))
+
+    def last_letter_bottlenecks(self):
+        return dict(sorted(self.last.items(), key=lambda x: x[1]))
+
+    def strategic_letters(self):
+        # Same rule as find_strategic_countries_from_graph
+        return {
+            letter for letter, count in self.last.items()
+            if count > 1 and self.first.get(letter, 0) < 2
+        }
+
+
+def _iter_chunks(paths, chunk_size, column, dedupe):
+    # dedupe matches the graph exactly but keeps every distinct name in memory
+    seen = set() if dedupe else None
+    for chunk in iter_name_chunks(paths, chunk_size=chunk_size, column=column):
+        if seen is not None:
+            chunk = [name for name in chunk if not (name in seen or seen.add(name))]
+        yield chunk
+
+
+def stream_letter_index(paths, chunk_size=100000, column='city', dedupe=False):
+    index = StreamingLetterIndex()
+    for chunk in _iter_chunks(paths, chunk_size, column, dedupe):
+        index.add(chunk)
+    return index
+
+
+def stream_strategic_names(paths, index, chunk_size=100000, column='city', dedupe=False):
+    # Second pass: only the names ending in a strategic letter are kept; pass the same
+    # dedupe as for the index
+    strategic_letters = index.strategic_letters()
+    for chunk in _iter_chunks(paths, chunk_size, column, dedupe):
+        for name in chunk:
+            if name[-1].lower() in strategic_letters:
+                yield name
+
+
+def stream_top_out_degree_names(paths, index, k=5, chunk_size=100000, column='city', dedupe=False):
+    # Only pairs at or above the k-th highest out-degree can contribute, so ties keep input order
+    degrees = sorted((index.out_degree(*pair) for pair, count in index.pairs.items() for _ in range(min(count, k))),
+                     reverse=True)
+    if not degrees:
+        return []
+    threshold = degrees[min(k, len(degrees)) - 1]
+    wanted = {pair for pair in index.pairs if index.out_degree(*pair) >= threshold}
+
+    # Bounded min-heap of (degree, -position, name): memory is k entries, not the wanted buckets
+    top = []
+    position = 0
+    for chunk in _iter_chunks(paths, chunk_size, column, dedupe):
+        for name in chunk:
+            pair = (name[0].lower(), name[-1].lower())
+            if pair in wanted:
+                entry = (index.out_degree(*pair), -position, name)
+                if len(top) < k:
+                    heapq.heappush(top, entry)
+                elif entry > top[0]:
+                    heapq.heapreplace(top, entry)
+            position += 1
+    return [(name, out_degree) for out_degree, _, name in sorted(top, reverse=True)]
+
+
+def main():
+    import graph_cache
+
+    # Deduplicated so the figures match the graph analyse.py builds from the same files
+    paths = graph_cache.DATASET_PATHS
+    index = stream_letter_index(paths, dedupe=True)
+
+    stats = index.degree_statistics()
+    print(f"Number of names: {stats['nodes']}")
+    print(f"Number of edges: {stats['edges']}")
+    for direction in ('out', 'in'):
+        degree = stats[f'{direction}_degree']
+        print(f"{direction}-degree: min {degree['min']}, max {degree['max']}, "
+              f"mean {degree['mean']:.2f}, variance {degree['variance']:.2f}")
+
+    print(f"Bottleneck letters: {', '.join(f'{letter}: {count}' for letter, count in index.bottleneck_letters().items())}")
+    print(f"Last letter bottlenecks: {', '.join(f'{letter}: {count}' for letter, count in index.last_letter_bottlenecks().items())}")
+
+    print("Strategic Letters:", index.strategic_letters())
+    print("Strategic Countries:", list(stream_strategic_names(paths, index, dedupe=True)))
+
+    print("\nTop 5 names with most outgoing connections:")
+    for name, out_degree in stream_top_out_degree_names(paths, index, dedupe=True):
+        print(f"{name}: {out_degree} outgoing connections")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import numpy as np
+import scipy.sparse as sp
+
+
+class GraphArrays:
+    """NumPy view of a DiGraph: node order, CSR adjacency and degree vectors."""
+
+    def __init__(self, G):
+        compact = getattr(G, 'compact', None)
+        if compact is not None:
+            # NetworkXView over a CompactDiGraph: reuse its arrays instead of walking every edge
+            self.nodes = compact.nodes
+            self.index = compact.index
+            self.adjacency = compact.adjacency()
+            self.out_degree = compact.out_degrees()
+            self.in_degree = compact.in_degrees()
+            return
+
+        self.nodes = list(G.nodes())
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        n = len(self.nodes)
+
+        edge_count = G.number_of_edges()
+        sources = np.fromiter((self.index[u] for u, _ in G.edges()), dtype=np.int64, count=edge_count)
+        targets = np.fromiter((self.index[v] for _, v in G.edges()), dtype=np.int64, count=edge_count)
+        self.adjacency = sp.csr_matrix(
+            (np.ones(edge_count, dtype=np.int64), (sources, targets)), shape=(n, n)
+        )
+
+        self.out_degree = np.diff(self.adjacency.indptr)
+        self.in_degree = np.bincount(targets, minlength=n)
+
+    def vector(self, values):
+        # Per-node dict (e.g. a centrality) as an array in node order
+        return np.fromiter((values[node] for node in self.nodes), dtype=np.float64, count=len(self.nodes))
+
+    def mask(self, nodes):
+        mask = np.zeros(len(self.nodes), dtype=np.int64)
+        mask[[self.index[node] for node in nodes]] = 1
+        return mask
+
+    def neighbor_counts(self, mask):
+        # Number of out-neighbours of every node that fall inside the mask, in one SpMV
+        return self.adjacency.dot(mask)
+
+
+def top_k(arrays, values, k=5, largest=True):
+    """The k (node, value) pairs with the largest (or smallest) values.
+
+    Ties keep node order, matching sorted(...)[:k] on the equivalent dict.
+    """
+    n = len(values)
+    if n == 0:
+        return []
+    keys = -values if largest else values
+    k = min(k, n)
+
+    # argpartition finds the k-th key; everything tied with it stays a candidate
+    kth = keys[np.argpartition(keys, k - 1)[k - 1]]
+    candidates = np.flatnonzero(keys <= kth)
+    order = candidates[np.lexsort((candidates, keys[candidates]))][:k]
+    return [(arrays.nodes[i], values[i].item()) for i in order]
+
+
+def squared_deviation(values):
+    return (values - values.mean()) ** 2
+
+
+def in_out_ratio(arrays):
+    # in/out degree, with inf for nodes that only receive edges and 0 for isolated nodes
+    in_degree = arrays.in_degree.astype(np.float64)
+    out_degree = arrays.out_degree.astype(np.float64)
+    ratio = np.zeros_like(in_degree)
+    np.divide(in_degree, out_degree, out=ratio, where=out_degree > 0)
+    ratio[(out_degree == 0) & (in_degree > 0)] = np.inf
+    return ratio
@@ -1,22 +1,69 @@
-import networkx as nx
+import os
+import sys
 import numpy as np
 from collections import defaultdict
-import infomap
-import leidenalg
-import igraph as ig
 
+# The shared graph builder lives alongside the Task-1 scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Task-1'))
+from chain_graph import build_letter_buckets, create_chain_graph
+from graph_cache import COUNTRIES_PATH, load_chain_graph, load_names
+from community_metrics import PartitionScorer, format_summary
+from profiling import profile
+from graph_export import export_chain_edges, export_edge_list, export_pair_quotient, load_infomap_network, to_igraph
 
 
-def apply_leiden_algorithm(countries):
 
-    # Create the graph
-    G = create_graph(countries)
+def leiden_partition(export, seed=None):
+    # Leiden on the shared edge list, weighted when it carries weights; a fixed seed
+    # makes the partition reproducible
+    import leidenalg
+
+    with profile('leiden', nodes=export.node_count, edges=export.edge_count):
+        ig_graph = to_igraph(export)
+        weights = 'weight' if export.weights is not None else None
+        return leidenalg.find_partition(ig_graph, leidenalg.ModularityVertexPartition, weights=weights, seed=seed)
+
+def _infomap(export, seed=None):
+    import infomap
+
+    flags = "--directed --two-level --silent"
+    if seed is not None:
+        flags += f" --seed {seed}"
+    im = infomap.Infomap(flags)
+
+    # Add all links in one bulk call
+    load_infomap_network(im, export)
+    return im
+
+def infomap_membership(export, seed=None):
+    # Infomap module id of every node, aligned with export.nodes
+    im = _infomap(export, seed)
     
-    # Convert the NetworkX graph to an igraph object
-    ig_graph = ig.Graph.from_networkx(G)
+    # Run Infomap
+    with profile('infomap', nodes=export.node_count, edges=export.edge_count):
+        im.run()
+    
+    membership = np.zeros(export.node_count, dtype=np.int64)
+    for node in im.tree:
+        if node.is_leaf:
+            membership[node.node_id] = node.module_id
+    return membership
+
+def infomap_codelength(export, membership):
+    # Map equation codelength of a fixed partition aligned with export.nodes (lower is better)
+    im = _infomap(export)
+    im.run(initial_partition={i: int(module) for i, module in enumerate(membership)}, no_infomap=True)
+    return im.codelength
+
+def apply_leiden_algorithm(countries, export=None, seed=None):
+
+    # Reuse the shared edge list when the caller already has one
+    if export is None:
+        names = list(dict.fromkeys(countries))
+        export = export_chain_edges(names, build_letter_buckets(names))
     
     # Apply the Leiden algorithm for community detection
-    partition = leidenalg.find_partition(ig_graph, leidenalg.ModularityVertexPartition)
+    partition = leiden_partition(export, seed=seed)
     
     # /// print all the communities
     print("Leiden Partition Communities:")
@@ -25,68 +72,84 @@ def apply_leiden_algorithm(countries):
     
     return partition
 
-def directed_infomap(G):
+def directed_infomap(G, export=None, seed=None):
 
-    # Create mapping between node names and indices
-    nodes = list(G.nodes())
-    node_to_idx = {node: idx for idx, node in enumerate(nodes)}
-    
-    im = infomap.Infomap("--directed --two-level")
+    # Interned node ids and the NumPy edge array, shared with Leiden
+    if export is None:
+        export = export_edge_list(G)
     
-    # Add nodes first
-    for node in nodes:
-        im.add_node(node_to_idx[node])
-    
-    # Add edges to Infomap network
-    for source, target in G.edges():
-        im.add_link(node_to_idx[source], node_to_idx[target])
-    
-    # Run Infomap
-    im.run()
+    membership = infomap_membership(export, seed=seed)
     
     # Convert results to dictionary using original node names
-    communities = {}
-    for node in im.tree:
-        if node.is_leaf:
-            original_node = nodes[node.node_id]
-            communities[original_node] = node.module_id
+    communities = {node: int(module) for node, module in zip(export.nodes, membership)}
     
     # print("Infomap Communities:", communities)  # Debugging
     return communities
 
 
 
-def evaluate_directed_communities(G, communities):
+def compressed_communities(buckets, algorithm='leiden', seed=None, quotient=None):
+    """Detect communities on the (first, last) letter quotient and expand back to names.
+
+    Leiden sees the class-to-class edge counts as weights, so every class-respecting
+    partition has the same modularity on the quotient as on the full graph. For
+    Infomap the quotient keeps the within-class edges as weighted self-loops, and
+    with the default link teleportation the flow aggregates exactly; the codelength
+    then differs from the full graph's only by a constant (the entropy of picking a
+    name within its class), so the optimum is the same among class-respecting
+    partitions. Both searches can still end in a different local optimum than a
+    run on the full graph; check_compressed_communities measures the gap.
+    """
+    if quotient is None:
+        quotient = export_pair_quotient(buckets)
+    if algorithm == 'leiden':
+        class_membership = leiden_partition(quotient, seed=seed).membership
+    else:
+        class_membership = infomap_membership(quotient, seed=seed)
+    return quotient.expand(class_membership)
+
+def compare_compressed_communities(export, communities, algorithm='leiden', seed=None):
+    """Score compressed communities against a real run of the same algorithm on the full graph.
+
+    Leiden is scored by modularity and Infomap by codelength, both on the full graph.
+    Returns (compressed score, full-run score, shortfall), where a positive shortfall
+    means the compressed result is worse. Both are stochastic local searches, so a
+    small gap either way is expected.
+    """
+    membership = [communities[node] for node in export.nodes]
+    if algorithm == 'leiden':
+        scorer = PartitionScorer(export)
+        compressed = scorer.summary(membership)['modularity']
+        full = scorer.summary(leiden_partition(export, seed=seed).membership)['modularity']
+        shortfall = full - compressed
+    else:
+        compressed = infomap_codelength(export, membership)
+        full = infomap_codelength(export, infomap_membership(export, seed=seed))
+        shortfall = compressed - full
+    return compressed, full, shortfall
+
+def check_compressed_communities(export, communities, algorithm='leiden', seed=None, tolerance=0.01):
+    # Strict form for tests and benchmarks: raise when the shortfall exceeds `tolerance` (relative)
+    compressed, full, shortfall = compare_compressed_communities(export, communities, algorithm, seed)
+    if shortfall > tolerance * abs(full):
+        raise ValueError(f"Compressed {algorithm} scores {compressed:.6f} against {full:.6f} on the full graph")
+    return compressed, full
+
+def evaluate_directed_communities(G, communities, export=None):
  
-    metrics = {}
-    
-    # 1. Directed Modularity
-    def directed_modularity():
-        m = G.number_of_edges()
-        if m == 0:
-            return 0
-        
-        Q = 0
-        for u, v in G.edges():
-            if communities[u] == communities[v]:
-                k_in_u = G.in_degree(u)
-                k_out_v = G.out_degree(v)
-                Q += 1 - (k_in_u * k_out_v) / m
-        
-        return Q / m
-     
-    
-    metrics['directed_modularity'] = directed_modularity()
-
+    # Directed modularity, coverage, conductance and density in one vectorized pass
+    if export is None:
+        export = export_edge_list(G)
+    metrics = PartitionScorer(export).summary(communities)
     
     return metrics
 
-def analyze_communities(G):
+def analyze_communities(G, export=None):
     results = {}
    
     print(f"\nRunning Infomap algorithm...")  # Debugging
-    communities = directed_infomap(G)
-    metrics = evaluate_directed_communities(G, communities)
+    communities = directed_infomap(G, export)
+    metrics = evaluate_directed_communities(G, communities, export)
     results['Infomap'] = {
         'communities': communities,
         'metrics': metrics
@@ -95,15 +158,7 @@ def analyze_communities(G):
     return results
 
 def create_graph(countries):
-    G = nx.DiGraph()
- 
-    G.add_nodes_from(countries)
-    
-    for source in countries:
-        for target in countries:
-            if source != target and source[-1].lower() == target[0].lower():
-                G.add_edge(source, target)
-    
+    G, _ = create_chain_graph(countries)
     return G
 
 
@@ -147,66 +202,26 @@ def analyze_communities_2(partition, countries,G):
     return analysis
 
 def main():
-    countries = [
-        "Afghanistan", "Albania", "Algeria", "Andorra", "Angola", 
-        "Antigua and Barbuda", "Argentina", "Armenia", "Australia", "Austria", 
-        "Azerbaijan", "Bahamas", "Bahrain", "Bangladesh", "Barbados", 
-        "Belarus", "Belgium", "Belize", "Benin", "Bhutan", 
-        "Bolivia", "Bosnia and Herzegovina", "Botswana", "Brazil", "Brunei", 
-        "Bulgaria", "Burkina Faso", "Burundi", "Cabo Verde", "Cambodia", 
-        "Cameroon", "Canada", "Central African Republic", "Chad", "Chile", 
-        "China", "Colombia", "Comoros", "Congo", "Costa Rica", 
-        "Croatia", "Cuba", "Cyprus", "Czech Republic", "Denmark", 
-        "Djibouti", "Dominica", "Dominican Republic", "East Timor", "Ecuador", 
-        "Egypt", "El Salvador", "Equatorial Guinea", "Eritrea", "Estonia", 
-        "Eswatini", "Ethiopia", "Fiji", "Finland", "France", 
-        "Gabon", "Gambia", "Georgia", "Germany", "Ghana", 
-        "Greece", "Grenada", "Guatemala", "Guinea", "Guinea-Bissau", 
-        "Guyana", "Haiti", "Honduras", "Hungary", "Iceland", 
-        "India", "Indonesia", "Iran", "Iraq", "Ireland", 
-        "Israel", "Italy", "Ivory Coast", "Jamaica", "Japan", 
-        "Jordan", "Kazakhstan", "Kenya", "Kiribati", "North Korea", 
-        "South Korea", "Kuwait", "Kyrgyzstan", "Laos", "Latvia", 
-        "Lebanon", "Lesotho", "Liberia", "Libya", "Liechtenstein", 
-        "Lithuania", "Luxembourg", "Madagascar", "Malawi", "Malaysia", 
-        "Maldives", "Mali", "Malta", "Marshall Islands", "Mauritania", 
-        "Mauritius", "Mexico", "Micronesia", "Moldova", "Monaco", 
-        "Mongolia", "Montenegro", "Morocco", "Mozambique", "Myanmar", 
-        "Namibia", "Nauru", "Nepal", "Netherlands", "New Zealand", 
-        "Nicaragua", "Niger", "Nigeria", "North Macedonia", "Norway", 
-        "Oman", "Pakistan", "Palau", "Panama", "Papua New Guinea", 
-        "Paraguay", "Peru", "Philippines", "Poland", "Portugal", 
-        "Qatar", "Romania", "Russia", "Rwanda", "Saint Kitts and Nevis", 
-        "Saint Lucia", "Saint Vincent and the Grenadines", "Samoa", "San Marino", 
-        "Sao Tome and Principe", "Saudi Arabia", "Senegal", "Serbia", "Seychelles", 
-        "Sierra Leone", "Singapore", "Slovakia", "Slovenia", "Solomon Islands", 
-        "Somalia", "South Africa", "South Sudan", "Spain", "Sri Lanka", 
-        "Sudan", "Suriname", "Sweden", "Switzerland", "Syria", 
-        "Taiwan", "Tajikistan", "Tanzania", "Thailand", "Togo", 
-        "Tonga", "Trinidad and Tobago", "Tunisia", "Turkey", "Turkmenistan", 
-        "Tuvalu", "Uganda", "Ukraine", "United Arab Emirates", "United Kingdom", 
-        "United States", "Uruguay", "Uzbekistan", "Vanuatu", "Vatican City", 
-        "Venezuela", "Vietnam", "Yemen", "Zambia", "Zimbabwe"
-    ]
-   
-
+    countries = load_names(COUNTRIES_PATH)
+    G, buckets = load_chain_graph(countries)
 
-    G = create_graph(countries)
+    # One integer edge list feeds both Infomap and Leiden
+    export = export_chain_edges(countries, buckets)
 
     print("Starting community analysis...\n")
-    results = analyze_communities(G)
+    results = analyze_communities(G, export)
 
       # Print community results for each algorithm
     for algo_name, result in results.items():
         print(f"\n{algo_name} Results:")
         print_community_results(result['communities'])
         print("\nMetrics:")
-        for metric, value in result['metrics'].items():
-            print(f"{metric}: {value:.4f}")
+        for line in format_summary(result['metrics']):
+            print(line)
             
     
     # Detect communities
-    partition = apply_leiden_algorithm(countries)
+    partition = apply_leiden_algorithm(countries, export, seed=1)
     
     # Analyze results
     analysis = analyze_communities_2(partition, countries,G)
@@ -220,6 +235,17 @@ def main():
         print(f"\nCommunity {community_id}:")
         print(members)
 
+    # Same detection on the letter-pair quotient, checked against the full graph
+    quotient = export_pair_quotient(buckets)
+    print(f"\nCompressed graph: {quotient.node_count} classes, {quotient.edge_count} weighted edges "
+          f"(from {export.node_count} names, {export.edge_count} edges)")
+    for algorithm, score in (('leiden', 'modularity'), ('infomap', 'codelength')):
+        communities = compressed_communities(buckets, algorithm=algorithm, seed=1, quotient=quotient)
+        compressed, full, shortfall = compare_compressed_communities(export, communities, algorithm=algorithm, seed=1)
+        gap = f"worse by {shortfall:.4f}" if shortfall > 0 else f"better by {-shortfall:.4f}" if shortfall < 0 else "equal"
+        print(f"{algorithm}: {len(set(communities.values()))} communities, {score} {compressed:.4f} expanded from the quotient, "
+              f"{full:.4f} from a full-graph run ({gap})")
+
 
 
 if __name__ == "__main__":
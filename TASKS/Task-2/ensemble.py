@@ -0,0 +1,127 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import scipy.sparse as sp
+
+from community import COUNTRIES_PATH, build_letter_buckets, infomap_membership, leiden_partition, load_names
+from community_metrics import PartitionScorer, format_summary
+from profiling import profile
+from graph_export import EdgeListGraph, export_chain_edges
+
+ALGORITHMS = ('leiden', 'infomap')
+
+# Edge list shipped to each worker once through the pool initializer
+_worker_export = None
+
+
+def _init_worker(export):
+    global _worker_export
+    _worker_export = export
+
+
+def _run_trial(algorithm, seed):
+    if algorithm == 'leiden':
+        return np.asarray(leiden_partition(_worker_export, seed=seed).membership, dtype=np.int64)
+    return infomap_membership(_worker_export, seed=seed)
+
+
+def run_ensemble(export, trials=10, algorithms=ALGORITHMS, workers=None):
+    """Run every algorithm with seeds 1..trials in a process pool (Infomap rejects seed 0).
+
+    Returns {algorithm: [membership array per seed]}, in seed order, so the result
+    does not depend on which worker finished first.
+    """
+    jobs = [(algorithm, seed) for algorithm in algorithms for seed in range(1, trials + 1)]
+    with profile('run_ensemble', nodes=export.node_count, edges=export.edge_count, runs=len(jobs)), \
+            ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                initializer=_init_worker, initargs=(export,)) as pool:
+        memberships = list(pool.map(_run_trial, *zip(*jobs)))
+
+    results = {algorithm: [] for algorithm in algorithms}
+    for (algorithm, _), membership in zip(jobs, memberships):
+        results[algorithm].append(membership)
+    return results
+
+
+def co_assignment_matrix(memberships, n):
+    # Fraction of runs in which each pair of nodes landed in the same community
+    total = sp.csr_matrix((n, n), dtype=np.float64)
+    for membership in memberships:
+        _, labels = np.unique(membership, return_inverse=True)
+        one_hot = sp.csr_matrix((np.ones(n), (np.arange(n), labels.ravel())), shape=(n, labels.max() + 1))
+        total = total + one_hot @ one_hot.T
+    return total / max(len(memberships), 1)
+
+
+def consensus_partition(consensus, nodes, threshold=0.5, seed=1):
+    """Seeded Leiden on the undirected graph of pairs co-assigned in at least `threshold` of the runs."""
+    upper = sp.triu(consensus, k=1).tocoo()
+    keep = upper.data >= threshold
+    edges = np.column_stack((upper.row[keep], upper.col[keep])).astype(np.int32)
+    graph = EdgeListGraph(nodes, edges, upper.data[keep])
+    partition = leiden_partition(_undirected(graph), seed=seed)
+    return np.asarray(partition.membership, dtype=np.int64)
+
+
+def _undirected(export):
+    # leiden_partition builds a directed graph; mirror every edge so weights count both ways
+    edges = np.concatenate((export.edges, export.edges[:, ::-1]))
+    weights = np.concatenate((export.weights, export.weights))
+    return EdgeListGraph(export.nodes, edges, weights)
+
+
+def node_stability(consensus, membership):
+    # Mean co-assignment of each node with the other members of its consensus community
+    n = len(membership)
+    pairs = consensus.tocoo()
+    same = (membership[pairs.row] == membership[pairs.col]) & (pairs.row != pairs.col)
+    totals = np.bincount(pairs.row[same], weights=pairs.data[same], minlength=n)
+    peers = np.bincount(membership, minlength=membership.max() + 1)[membership] - 1
+    return np.divide(totals, peers, out=np.ones(n), where=peers > 0)
+
+
+def ensemble_communities(export, trials=10, algorithms=ALGORITHMS, workers=None, threshold=0.5):
+    runs = run_ensemble(export, trials=trials, algorithms=algorithms, workers=workers)
+    memberships = [membership for algorithm in algorithms for membership in runs[algorithm]]
+    consensus = co_assignment_matrix(memberships, export.node_count)
+    membership = consensus_partition(consensus, export.nodes, threshold=threshold)
+    return {
+        'runs': runs,
+        'consensus': consensus,
+        'membership': membership,
+        'stability': node_stability(consensus, membership),
+    }
+
+
+def main():
+    countries = load_names(COUNTRIES_PATH)
+    export = export_chain_edges(countries, build_letter_buckets(countries))
+
+    result = ensemble_communities(export)
+    scorer = PartitionScorer(export)
+
+    print("Per-run modularity:")
+    for algorithm, memberships in result['runs'].items():
+        values = [scorer.summary(membership)['modularity'] for membership in memberships]
+        print(f"{algorithm}: mean {np.mean(values):.4f}, min {np.min(values):.4f}, max {np.max(values):.4f}")
+
+    membership = result['membership']
+    print("\nConsensus Communities:")
+    for community in np.unique(membership):
+        members = [export.nodes[i] for i in np.flatnonzero(membership == community)]
+        print(f"\nCommunity {community + 1}:")
+        print(", ".join(sorted(members)))
+
+    print("\nConsensus quality:")
+    for line in format_summary(scorer.summary(membership)):
+        print(line)
+
+    print("\nLeast stable countries:")
+    stability = result['stability']
+    for i in np.argsort(stability, kind='stable')[:10]:
+        print(f"{export.nodes[i]}: {stability[i]:.2f}")
+
+
+if __name__ == "__main__":
+    main()
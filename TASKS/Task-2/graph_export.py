@@ -0,0 +1,142 @@
+import numpy as np
+
+
+class EdgeListGraph:
+    """Interned node names plus an (m, 2) int32 edge array, shared by igraph and Infomap.
+
+    weights, when set, is a float64 array aligned with edges; node_weights, when set,
+    is a float64 array aligned with nodes (Infomap teleportation weights).
+    """
+
+    def __init__(self, nodes, edges, weights=None, node_weights=None):
+        self.nodes = list(nodes)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.edges = edges
+        self.weights = weights
+        self.node_weights = node_weights
+
+    @property
+    def node_count(self):
+        return len(self.nodes)
+
+    @property
+    def edge_count(self):
+        return len(self.edges)
+
+
+def export_edge_list(G, weight=None):
+    # Generic path: one pass over G.edges() into preallocated arrays
+    nodes = list(G.nodes())
+    index = {node: i for i, node in enumerate(nodes)}
+    m = G.number_of_edges()
+
+    edges = np.empty((m, 2), dtype=np.int32)
+    weights = np.empty(m, dtype=np.float64) if weight else None
+    for i, (u, v, data) in enumerate(G.edges(data=True)):
+        edges[i, 0] = index[u]
+        edges[i, 1] = index[v]
+        if weights is not None:
+            weights[i] = data.get(weight, 1.0)
+
+    return EdgeListGraph(nodes, edges, weights)
+
+
+def export_chain_edges(names, buckets):
+    """Edge array of the chain graph built straight from its letter buckets.
+
+    For every letter the "ends with" ids are crossed with the "starts with" ids
+    using NumPy, then self-pairs are dropped, so no per-edge Python work is done.
+    """
+    nodes = list(dict.fromkeys(names))
+    index = {node: i for i, node in enumerate(nodes)}
+    first = buckets['first']
+
+    blocks = []
+    for letter, sources in buckets['last'].items():
+        targets = first.get(letter)
+        if not targets:
+            continue
+        source_ids = np.fromiter((index[name] for name in sources), dtype=np.int32, count=len(sources))
+        target_ids = np.fromiter((index[name] for name in targets), dtype=np.int32, count=len(targets))
+        block = np.column_stack((
+            np.repeat(source_ids, len(target_ids)),
+            np.tile(target_ids, len(source_ids)),
+        ))
+        blocks.append(block[block[:, 0] != block[:, 1]])
+
+    edges = np.concatenate(blocks) if blocks else np.empty((0, 2), dtype=np.int32)
+    return EdgeListGraph(nodes, edges)
+
+
+def to_igraph(export, directed=True):
+    import igraph as ig
+
+    graph = ig.Graph(n=export.node_count, edges=export.edges, directed=directed)
+    graph.vs['name'] = export.nodes
+    if export.weights is not None:
+        graph.es['weight'] = export.weights
+    return graph
+
+
+def load_infomap_network(im, export):
+    # Links go in as one NumPy block; only weighted or isolated nodes need individual calls
+    if export.node_weights is not None:
+        for node_id, weight in enumerate(export.node_weights.tolist()):
+            im.add_node(node_id, teleportation_weight=weight)
+
+    if export.weights is not None:
+        links = np.column_stack((export.edges.astype(np.float64), export.weights))
+    else:
+        links = export.edges.astype(np.int64)
+    if len(links):
+        im.add_links(links)
+
+    if export.node_weights is None:
+        linked = np.zeros(export.node_count, dtype=bool)
+        linked[export.edges.ravel()] = True
+        for node_id in np.flatnonzero(~linked):
+            im.add_node(int(node_id))
+
+
+class QuotientGraph(EdgeListGraph):
+    """Chain graph collapsed to one weighted node per (first letter, last letter) class.
+
+    Names in one class have identical neighbourhoods, so the edge weight between two
+    classes is the number of name edges between them, including the c * (c - 1)
+    edges inside a class that starts and ends on the same letter, kept as a weighted
+    self-loop. members[i] holds the names behind node i, and the class sizes double
+    as node weights so teleportation to nodes lands on a class as often as on its
+    names.
+    """
+
+    def __init__(self, nodes, edges, weights, members):
+        sizes = np.array([len(group) for group in members], dtype=np.int64)
+        super().__init__(nodes, edges, weights, node_weights=sizes.astype(np.float64))
+        self.members = members
+        self.sizes = sizes
+
+    def expand(self, class_membership):
+        # Class-level community labels back to {name: community}
+        return {
+            name: int(community)
+            for group, community in zip(self.members, class_membership)
+            for name in group
+        }
+
+
+def export_pair_quotient(buckets):
+    # Needs only the pair buckets, so the name-level edge list is never built
+    pairs = list(buckets['pair'])
+    members = [list(dict.fromkeys(buckets['pair'][pair])) for pair in pairs]
+    sizes = np.array([len(group) for group in members], dtype=np.float64)
+
+    first = np.array([pair[0] for pair in pairs])
+    last = np.array([pair[1] for pair in pairs])
+    source, target = np.nonzero(last[:, None] == first[None, :])
+
+    weights = sizes[source] * sizes[target]
+    weights[source == target] -= sizes[source[source == target]]
+    keep = weights > 0
+
+    edges = np.column_stack((source[keep], target[keep])).astype(np.int32)
+    return QuotientGraph(pairs, edges, weights[keep], members)
@@ -0,0 +1,200 @@
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, '..', 'Task-1'))
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, '..', 'Task-2'))
+
+from analyse import REPORT_SECTIONS
+from chain_graph import build_letter_buckets, create_chain_graph
+from graph_cache import CITY_CSV_PATH, COUNTRIES_PATH, load_names
+from graph_metrics import GraphMetrics
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+DEFAULT_RESULTS_PATH = os.path.join(BENCHMARK_DIR, 'results.json')
+DEFAULT_BASELINE_PATH = os.path.join(BENCHMARK_DIR, 'baseline.json')
+
+# Largest name count each kind of stage is run at; the full graph has ~n^2/23 edges
+MAX_GRAPH_SIZE = 5000
+MAX_CENTRALITY_SIZE = 1000
+MAX_COMMUNITY_SIZE = 5000
+
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+
+def letter_profile(names):
+    # Joint (first, last) letter distribution and name lengths of the real datasets
+    pairs = Counter((name[0].lower(), name[-1].lower()) for name in names)
+    lengths = [len(name) for name in names]
+    return pairs, lengths
+
+
+def synthetic_names(size, profile, seed=0):
+    """Unique names whose (first, last) letters follow the dataset distribution."""
+    pairs, lengths = profile
+    rng = random.Random(seed)
+    choices = list(pairs)
+    weights = [pairs[pair] for pair in choices]
+
+    names = []
+    for i, (first, last) in enumerate(rng.choices(choices, weights=weights, k=size)):
+        middle_length = max(rng.choice(lengths) - 2, 0)
+        middle = ''.join(rng.choice(LETTERS) for _ in range(middle_length))
+        # The index keeps names unique without touching the first and last letters
+        names.append(f'{first.upper()}{middle}{i}{last}')
+    return names
+
+
+def measure(func, track_memory):
+    gc.collect()
+    if track_memory:
+        tracemalloc.start()
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = func()
+    finally:
+        wall = time.perf_counter() - start_wall
+        cpu = time.process_time() - start_cpu
+        peak = None
+        if track_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    return result, wall, cpu, peak
+
+
+def community_stages():
+    # Community detection needs infomap, leidenalg and igraph; skip it when they are missing
+    try:
+        import community
+    except ImportError as exc:
+        print(f"Skipping community stages: {exc}", file=sys.stderr)
+        return []
+    return [
+        ('directed_infomap', MAX_COMMUNITY_SIZE, lambda names, G: community.directed_infomap(G)),
+        ('apply_leiden_algorithm', MAX_COMMUNITY_SIZE, lambda names, G: community.apply_leiden_algorithm(names)),
+    ]
+
+
+def build_stages():
+    """(name, max_size, func(names, G)) in run order; G is None for name-only stages."""
+    stages = [
+        ('build_letter_buckets', None, lambda names, G: build_letter_buckets(names)),
+        ('create_chain_graph', MAX_GRAPH_SIZE, lambda names, G: create_chain_graph(names)),
+    ]
+    for metric in ('betweenness', 'closeness', 'sccs', 'wccs', 'arrays'):
+        limit = MAX_CENTRALITY_SIZE if metric in ('betweenness', 'closeness') else MAX_GRAPH_SIZE
+        stages.append((f'metric:{metric}', limit,
+                       lambda names, G, metric=metric: getattr(GraphMetrics(G, cache_dir=None), metric)))
+    for section, requires in REPORT_SECTIONS:
+        heavy = {'betweenness', 'closeness'} & set(requires)
+        limit = MAX_CENTRALITY_SIZE if heavy else MAX_GRAPH_SIZE
+        stages.append((f'report:{section.__name__}', limit,
+                       lambda names, G, section=section: section(G, GraphMetrics(G, cache_dir=None))))
+    stages.extend(community_stages())
+    return stages
+
+
+def run_benchmarks(sizes, seed=0, track_memory=True, only=None):
+    profile = letter_profile(load_names(COUNTRIES_PATH, CITY_CSV_PATH))
+    stages = [stage for stage in build_stages() if not only or any(key in stage[0] for key in only)]
+    results = []
+
+    for size in sizes:
+        names = synthetic_names(size, profile, seed=seed)
+        G = create_chain_graph(names)[0] if size <= MAX_GRAPH_SIZE else None
+        graph_size = {'nodes': G.number_of_nodes(), 'edges': G.number_of_edges()} if G is not None else {}
+
+        for stage, max_size, func in stages:
+            record = {'stage': stage, 'size': size, **graph_size}
+            if max_size is not None and size > max_size:
+                record['skipped'] = f'size above {max_size}'
+                results.append(record)
+                continue
+
+            _, wall, cpu, _ = measure(lambda: func(names, G), track_memory=False)
+            record['wall_seconds'] = wall
+            record['cpu_seconds'] = cpu
+            if track_memory:
+                # Separate pass, tracemalloc would otherwise inflate the timings
+                _, _, _, peak = measure(lambda: func(names, G), track_memory=True)
+                record['peak_bytes'] = peak
+            results.append(record)
+            print(f"{stage:<55} n={size:<8} {wall:9.4f}s", file=sys.stderr)
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'seed': seed,
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold):
+    # Pair up (stage, size) records and flag any that got slower than threshold x baseline
+    previous = {(r['stage'], r['size']): r for r in baseline['results'] if 'wall_seconds' in r}
+    regressions = []
+    for record in current['results']:
+        old = previous.get((record['stage'], record['size']))
+        if old is None or 'wall_seconds' not in record:
+            continue
+        ratio = record['wall_seconds'] / max(old['wall_seconds'], 1e-9)
+        print(f"{record['stage']:<55} n={record['size']:<8} {old['wall_seconds']:9.4f}s -> "
+              f"{record['wall_seconds']:9.4f}s ({ratio:.2f}x)")
+        if ratio > threshold:
+            regressions.append((record['stage'], record['size'], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark graph construction, analyses and community detection.")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated synthetic name counts")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', action='append', help="run only stages whose name contains this text")
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc peak-memory pass")
+    parser.add_argument('--output', default=DEFAULT_RESULTS_PATH)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="slowdown ratio against the baseline that counts as a regression")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    current = run_benchmarks(sizes, seed=args.seed, track_memory=not args.no_memory, only=args.only)
+
+    with open(args.output, 'w') as f:
+        json.dump(current, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(current, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.2f}x:")
+            for stage, size, ratio in regressions:
+                print(f"{stage} n={size}: {ratio:.2f}x")
+            sys.exit(1)
+        print("\nNo regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
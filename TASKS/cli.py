@@ -0,0 +1,247 @@
+"""Single entry point for the chain-graph tools.
+
+    python TASKS/cli.py build --format graphml --output graph.graphml
+    python TASKS/cli.py analyse --workers 4 --format json
+    python TASKS/cli.py communities --algorithm leiden --seed 1 --format csv
+    python TASKS/cli.py visualize --output graph.svg --max-edges 5000
+    python TASKS/cli.py --profile profile.json analyse
+    python TASKS/cli.py serve --socket /tmp/chain.sock
+    python TASKS/cli.py build --overlap 2 --normalize --output graph.graphml
+
+Only the modules a subcommand needs are imported, so e.g. `analyse` never loads
+matplotlib, igraph, leidenalg or infomap.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+
+TASKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TASKS_DIR, 'Task-1'))
+sys.path.insert(0, os.path.join(TASKS_DIR, 'Task-2'))
+
+from graph_cache import COUNTRIES_PATH, DATASET_PATHS, load_chain_graph, load_names
+from profiling import profile, profiled_run
+
+GRAPH_WRITERS = {
+    'graphml': 'write_graphml',
+    'gexf': 'write_gexf',
+    'edgelist': 'write_edgelist',
+    'adjlist': 'write_adjlist',
+}
+
+
+def _open_output(path):
+    # '-' or no path means stdout
+    if not path or path == '-':
+        return contextlib.nullcontext(sys.stdout)
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def _rule(args):
+    from chain_rules import ChainRule
+
+    return ChainRule(overlap=args.overlap, normalize=args.normalize)
+
+
+def _load_graph(args):
+    names = load_names(*args.input)
+    return load_chain_graph(names, rebuild=getattr(args, 'rebuild', False), rule=_rule(args))
+
+
+def build(args):
+    G, _ = _load_graph(args)
+    print(f"Number of nodes: {G.number_of_nodes()}", file=sys.stderr)
+    print(f"Number of edges: {G.number_of_edges()}", file=sys.stderr)
+    if args.output:
+        import networkx as nx
+
+        if args.format == 'edgelist':
+            nx.write_edgelist(G, args.output, delimiter='\t', data=False)
+        else:
+            getattr(nx, GRAPH_WRITERS[args.format])(G, args.output)
+
+
+def analyse(args):
+    from analyse import REPORT_SECTIONS, call_all_functions
+    from graph_metrics import GraphMetrics
+
+    if args.compact:
+        from chain_rules import GRAPH_RULE_KEY, LETTER_RULE
+        from compact_graph import CompactDiGraph
+
+        names = load_names(*args.input)
+        rule = _rule(args)
+        with profile('compact_graph', names=len(names)):
+            G = CompactDiGraph.from_names(names, rule).networkx_view()
+            if rule != LETTER_RULE:
+                G.graph[GRAPH_RULE_KEY] = rule.describe()
+    else:
+        G, _ = _load_graph(args)
+    metrics = GraphMetrics(G)
+
+    if args.format == 'json':
+        report = {}
+        for section, _ in REPORT_SECTIONS:
+            buffer = io.StringIO()
+            with contextlib.redirect_stdout(buffer), profile(section.__name__, G):
+                section(G, metrics)
+            report[section.__name__.removeprefix('print_')] = buffer.getvalue()
+        with _open_output(args.output) as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+        return
+
+    if args.workers and args.workers > 1:
+        from parallel_report import run_report
+
+        text = run_report(G, workers=args.workers, metrics=metrics)
+    else:
+        buffer = io.StringIO()
+        with contextlib.redirect_stdout(buffer):
+            call_all_functions(G, metrics)
+        text = buffer.getvalue()
+    with _open_output(args.output) as f:
+        f.write(text)
+
+
+def communities(args):
+    from chain_graph import build_letter_buckets
+    from community import compressed_communities, infomap_membership, leiden_partition
+    from community_metrics import METRIC_NOTES, PartitionScorer, format_summary
+    from graph_export import export_chain_edges
+
+    names = load_names(*args.input)
+    buckets = build_letter_buckets(names, _rule(args))
+    export = export_chain_edges(names, buckets)
+
+    if args.compressed and args.algorithm != 'ensemble':
+        membership = compressed_communities(buckets, algorithm=args.algorithm, seed=args.seed)
+    elif args.algorithm == 'leiden':
+        partition = leiden_partition(export, seed=args.seed).membership
+        membership = dict(zip(export.nodes, partition))
+    elif args.algorithm == 'infomap':
+        membership = dict(zip(export.nodes, infomap_membership(export, seed=args.seed).tolist()))
+    else:
+        from ensemble import ensemble_communities
+
+        result = ensemble_communities(export, trials=args.trials, workers=args.workers)
+        membership = dict(zip(export.nodes, result['membership'].tolist()))
+    membership = {name: int(community) for name, community in membership.items()}
+    metrics = PartitionScorer(export).summary(membership)
+
+    with _open_output(args.output) as f:
+        if args.format == 'json':
+            notes = {metric: note for metric, note in METRIC_NOTES.items() if metric in metrics}
+            json.dump({'membership': membership, 'metrics': metrics, 'notes': notes}, f, indent=2)
+            f.write('\n')
+        elif args.format == 'csv':
+            import csv
+
+            writer = csv.writer(f)
+            writer.writerow(['name', 'community'])
+            writer.writerows(membership.items())
+        else:
+            groups = {}
+            for name, community in membership.items():
+                groups.setdefault(community, []).append(name)
+            for community, members in sorted(groups.items()):
+                f.write(f"\nCommunity {community}:\n{', '.join(sorted(members))}\n")
+            f.write("\nMetrics:\n")
+            for line in format_summary(metrics):
+                f.write(f"{line}\n")
+
+
+def visualize(args):
+    from fast_render import visualize_graph_fast, visualize_letter_overview
+
+    G, _ = _load_graph(args)
+    output = args.output or f'cities_and_countries.{args.format}'
+    visualize_graph_fast(G, output, max_edges=args.max_edges, dpi=args.dpi)
+    if args.overview != '':
+        visualize_letter_overview(G, args.overview or f'letter_overview.{args.format}', dpi=args.dpi)
+
+
+def serve(args):
+    import asyncio
+
+    from query_server import QueryIndex, QueryServer
+
+    G, buckets = _load_graph(args)
+    communities = None
+    if not args.no_communities:
+        from community import compressed_communities
+
+        communities = compressed_communities(buckets, algorithm='leiden', seed=1)
+    server = QueryServer(QueryIndex(G, buckets, communities, _rule(args)))
+    where = args.socket or f'{args.host}:{args.port}'
+    print(f"Serving {G.number_of_nodes()} names on {where}", file=sys.stderr)
+    asyncio.run(server.serve(path=args.socket, host=args.host, port=args.port))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Build, analyse and draw the last-letter/first-letter chain graph.")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="write per-stage wall time, CPU time, peak memory and graph sizes to this JSON file")
+    parser.add_argument('--profile-no-memory', action='store_true',
+                        help="skip tracemalloc when profiling (lower overhead, no peak memory)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def add_command(name, func, default_input, help):
+        sub = subparsers.add_parser(name, help=help)
+        sub.add_argument('--input', nargs='+', default=default_input,
+                         help="name lists (.txt, .csv or .graphml), merged in order")
+        sub.add_argument('--overlap', type=int, default=1, metavar='K',
+                         help="chain on the last K characters of a name matching the first K of the next")
+        sub.add_argument('--normalize', action='store_true',
+                         help="compare names without accents, case, spaces or punctuation")
+        sub.set_defaults(func=func)
+        return sub
+
+    sub = add_command('build', build, list(DATASET_PATHS), "build (or refresh) the cached graph and export it")
+    sub.add_argument('--rebuild', action='store_true', help="ignore the cached graph")
+    sub.add_argument('--format', choices=sorted(GRAPH_WRITERS), default='graphml')
+    sub.add_argument('--output', help="write the graph here")
+
+    sub = add_command('analyse', analyse, list(DATASET_PATHS), "run the analyse.py report")
+    sub.add_argument('--workers', type=int, help="run report sections in this many processes")
+    sub.add_argument('--compact', action='store_true', help="hold the graph in int32 CSR/CSC arrays instead of an nx.DiGraph")
+    sub.add_argument('--format', choices=['text', 'json'], default='text')
+    sub.add_argument('--output', help="write the report here instead of stdout")
+
+    sub = add_command('communities', communities, [COUNTRIES_PATH], "detect communities")
+    sub.add_argument('--algorithm', choices=['infomap', 'leiden', 'ensemble'], default='infomap')
+    sub.add_argument('--compressed', action='store_true', help="run on the (first, last) letter quotient graph")
+    sub.add_argument('--seed', type=int)
+    sub.add_argument('--trials', type=int, default=10, help="runs per algorithm for --algorithm ensemble")
+    sub.add_argument('--workers', type=int)
+    sub.add_argument('--format', choices=['text', 'json', 'csv'], default='text')
+    sub.add_argument('--output', help="write the communities here instead of stdout")
+
+    sub = add_command('visualize', visualize, list(DATASET_PATHS), "draw the graph and the letter overview")
+    sub.add_argument('--format', choices=['png', 'svg', 'pdf'], default='png')
+    sub.add_argument('--output', help="graph image path (default cities_and_countries.<format>)")
+    sub.add_argument('--overview', help="letter overview path; pass '' to skip it")
+    sub.add_argument('--max-edges', type=int, help="draw only the edges between the most central nodes")
+    sub.add_argument('--dpi', type=int, default=150)
+
+    sub = add_command('serve', serve, [COUNTRIES_PATH], "answer move, degree, elimination and community queries")
+    sub.add_argument('--socket', help="listen on this Unix socket instead of TCP")
+    sub.add_argument('--host', default='127.0.0.1')
+    sub.add_argument('--port', type=int, default=8765)
+    sub.add_argument('--no-communities', action='store_true', help="skip the community lookup table")
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    with profiled_run(args.profile, track_memory=not args.profile_no_memory):
+        with profile(args.command):
+            args.func(args)
+
+
+if __name__ == "__main__":
+    main()